@@ -9,6 +9,9 @@ dragenSomaticVariantCallingOutputUri and
 dragenGermlineVariantCallingSampleName
 dragenGermlineVariantCallingOutputUri
 
+(passed either one sample per invocation, or as a list of samples so that the germline and tumor
+outputs share a single invocation)
+
 Perform the following:
 
 For each directory collect the following metrics:
@@ -26,15 +29,24 @@ For each directory collect the following metrics:
 """
 
 # Standard imports
-from typing import Optional, Union
-from io import StringIO
-import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import gettempdir
+from threading import Lock
+from typing import Any, Callable, Dict, List, Literal, NotRequired, Optional, Protocol, Tuple, TypedDict, Union
+from urllib.parse import urlparse
+import csv
+import hashlib
 import json
+import logging
+import math
+import os
+import ijson
+import requests
+from requests.adapters import HTTPAdapter
 
 # Layer imports
-from orcabus_api_tools.filemanager import get_presigned_url, get_file_object_from_s3_uri
-from orcabus_api_tools.filemanager.errors import S3FileNotFoundError
+from orcabus_api_tools.filemanager import get_presigned_url, list_files_recursively
 
 # Globals
 FILENAME_BY_METRIC = {
@@ -47,367 +59,624 @@ FILENAME_BY_METRIC = {
     "METRICS_JSON": "{SAMPLE_NAME}.metrics.json",
 }
 
+# How each DRAGEN output file is parsed
+# * metrics_csv: headerless 'SECTION,sample,metric,value[,pct]' summary csv, selectors are metric names
+# * table_csv: csv with a header row and one row per sample, selectors are column names
+# * json: selectors are dot-separated paths to leaf values (may contain {SAMPLE_NAME})
+FileFormatType = Literal["metrics_csv", "table_csv", "json"]
+FILE_FORMAT_BY_METRIC: Dict[str, FileFormatType] = {
+    "HRD_SCORE": "table_csv",
+    "TMB_METRICS": "metrics_csv",
+    "SV_METRICS": "metrics_csv",
+    "CNV_METRICS": "metrics_csv",
+    "TUMOR_MAPPING_METRICS": "metrics_csv",
+    "MAPPING_METRICS": "metrics_csv",
+    "METRICS_JSON": "json",
+}
+JSON_SCALAR_EVENTS = ("null", "boolean", "integer", "double", "number", "string")
 
-def na_round(value: Union[float, str], *args) -> Optional[float]:
-    if value == 'NA' or pd.isna(value):
-        return None
-    return round(float(value), *args)
-
-
-def read_file_from_s3(uri: str) -> Optional[str]:
-
-    try:
-        file_obj = get_file_object_from_s3_uri(uri)
-    except S3FileNotFoundError:
-        return None
-
-    return requests.get(get_presigned_url(file_obj['s3ObjectId'])).text
+# Fetch concurrency, the session is kept at module level so that
+# warm invocations reuse the same keep-alive connections
+MAX_FETCH_WORKERS = 8
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=MAX_FETCH_WORKERS, pool_maxsize=MAX_FETCH_WORKERS)
+)
 
+# Parsed metrics cache, /tmp persists across warm invocations of the same Lambda container
+METRICS_CACHE_DIR = Path(gettempdir()) / "dragen-metrics-cache"
+METRICS_CACHE_MAX_SIZE_BYTES = 64 * 1024 * 1024
 
-def read_csv_from_s3(
-        uri: str,
-        **kwargs
-) -> Optional[pd.DataFrame]:
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
-    csv_content = read_file_from_s3(uri)
 
-    if csv_content is None:
+def na_round(value: Optional[Union[float, str]], *args) -> Optional[float]:
+    if value is None or value == 'NA' or value == '':
         return None
-
-    return pd.read_csv(
-        StringIO(csv_content),
-        **kwargs,
-    )
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return round(value, *args)
 
 
-def read_json_from_s3(
-        uri: str,
-        **kwargs
-) -> Optional[dict]:
+def round_metric(value: Optional[Union[float, str]]) -> Optional[float]:
+    return na_round(value, 4)
 
-    json_content = read_file_from_s3(uri)
 
-    if json_content is None:
+def percentage_to_fraction(value: Optional[Union[float, str]]) -> Optional[float]:
+    if value is None:
         return None
-
-    return json.loads(json_content)
+    return na_round(float(value) / 100, 4)
 
 
-def get_hrd_score(
-        output_uri: str,
-        sample_name: str
-) -> Optional[int]:
+class MetricSpec(TypedDict):
     """
-    HRD DF looks like this:
-    Sample,LOH_Score,TAI_Score,LST_Score,HRD_Score
-    L2300902,18,27,34,79
+    A post analysis tag and where to find it in the DRAGEN outputs
     """
-    hrd_score_file_name = FILENAME_BY_METRIC["HRD_SCORE"].format(
-        SAMPLE_NAME=sample_name,
-    )
-    hrd_score_df = read_csv_from_s3(f"{output_uri}{hrd_score_file_name}")
-
-    if hrd_score_df is None or hrd_score_df.empty:
+    # snake_case tag name, prefixed with 'tumor_' and camel-cased by the handler
+    tag_name: str
+    # Key of the source file in FILENAME_BY_METRIC
+    file_key: str
+    # Metric name, column name or json path, depending on the format of the source file
+    selector: str
+    # Applied to the raw value, values are returned as is when not set
+    transform: NotRequired[Callable[[Any], Any]]
+    tumor_only: NotRequired[bool]
+    germline_only: NotRequired[bool]
+
+
+# Metrics are pulled from each source file in a single pass,
+# so adding a metric from a file we already read does not add any more I/O
+METRIC_REGISTRY: List[MetricSpec] = [
+    # Sample,LOH_Score,TAI_Score,LST_Score,HRD_Score
+    # L2300902,18,27,34,79
+    {
+        "tag_name": "hrd_score",
+        "file_key": "HRD_SCORE",
+        "selector": "HRD_Score",
+        "tumor_only": True,
+    },
+    # TMB SUMMARY,,TMB,8.5
+    {
+        "tag_name": "tmb_score",
+        "file_key": "TMB_METRICS",
+        "selector": "TMB",
+        "tumor_only": True,
+    },
+    # SV SUMMARY,L2300902/L2300901,Total number of structural variants (PASS),753
+    {
+        "tag_name": "sv_pass_count",
+        "file_key": "SV_METRICS",
+        "selector": "Total number of structural variants (PASS)",
+        "tumor_only": True,
+    },
+    # CNV SUMMARY,,Estimated tumor purity,0.60
+    {
+        "tag_name": "cnv_estimated_tumor_purity",
+        "file_key": "CNV_METRICS",
+        "selector": "Estimated tumor purity",
+        "transform": round_metric,
+        "tumor_only": True,
+    },
+    # CNV SUMMARY,,Overall ploidy,2.06
+    {
+        "tag_name": "cnv_overall_ploidy",
+        "file_key": "CNV_METRICS",
+        "selector": "Overall ploidy",
+        "transform": round_metric,
+        "tumor_only": True,
+    },
+    # COVERAGE SUMMARY,,Average autosomal coverage over genome,82.16
+    {
+        "tag_name": "avg_autosomal_coverage_over_genome",
+        "file_key": "TUMOR_MAPPING_METRICS",
+        "selector": "Average autosomal coverage over genome",
+        "transform": round_metric,
+        "tumor_only": True,
+    },
+    {
+        "tag_name": "avg_autosomal_coverage_over_genome",
+        "file_key": "MAPPING_METRICS",
+        "selector": "Average autosomal coverage over genome",
+        "transform": round_metric,
+        "germline_only": True,
+    },
+    # metrics.json
+    {
+        "tag_name": "contamination_rate",
+        "file_key": "METRICS_JSON",
+        "selector": "modules.mapAlign.globalMetrics.estimatedSampleContamination.value",
+        "transform": round_metric,
+    },
+    {
+        "tag_name": "duplication_frac",
+        "file_key": "METRICS_JSON",
+        "selector": "modules.mapAlign.globalMetrics.duplicateMarkedReads.percentage",
+        "transform": percentage_to_fraction,
+    },
+    {
+        "tag_name": "total_post_filter_variants",
+        "file_key": "METRICS_JSON",
+        "selector": "modules.variantCaller.postFilter.{SAMPLE_NAME}.totalVariants.value",
+    },
+    {
+        "tag_name": "ti_tv_ratio",
+        "file_key": "METRICS_JSON",
+        "selector": "modules.variantCaller.postFilter.{SAMPLE_NAME}.tiTvRatio.value",
+        "transform": round_metric,
+    },
+]
+
+
+def to_metric_value(value: str) -> Optional[Union[int, float, str]]:
+    """
+    Convert a DRAGEN csv cell to an int or float where possible,
+    'NA' and empty cells are returned as None
+    """
+    value = value.strip()
+    if value in ('NA', ''):
         return None
-
-    return hrd_score_df.query("Sample == @sample_name")["HRD_Score"].item()
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
 
 
-def get_tmb_score(
-        output_uri: str,
-        sample_name: str
-) -> Optional[int]:
-    """
-    TMB DF looks like this:
-    Sample,TMB,Callable_Bases,Mutations,Panel_Size
-    L2300902,8.5,944000000,8,944000000
+def read_dragen_metrics_csv(csv_content: str) -> Dict[str, Optional[Union[int, float, str]]]:
     """
-    tmb_metrics_file_name = FILENAME_BY_METRIC["TMB_METRICS"].format(
-        SAMPLE_NAME=sample_name
-    )
-    tmb_metrics_df = read_csv_from_s3(
-        f"{output_uri}{tmb_metrics_file_name}",
-        header=None,
-        names=[
-            "summary", "null", "metric", "value"
-        ]
-    )
+    Stream a DRAGEN summary csv into a metric -> value index
 
-    if tmb_metrics_df is None or tmb_metrics_df.empty:
-        return None
+    Summary csvs are headerless with the columns section, sample, metric, value and (optionally) pct, i.e.
+    CNV SUMMARY,,Number of passing deletions,70,59.32
 
-    return tmb_metrics_df.query("metric == 'TMB'")["value"].item()
+    The pct column is not indexed, 'NA' values are stored as None.
+    If a metric appears more than once, the first value is kept.
+    """
+    metrics_index = {}
+    for row in csv.reader(csv_content.splitlines()):
+        if len(row) < 4:
+            continue
+        metrics_index.setdefault(row[2], to_metric_value(row[3]))
+    return metrics_index
 
 
-def get_sv_pass_count(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[int]:
+def read_dragen_table_csv(csv_content: str) -> List[Dict[str, Optional[Union[int, float, str]]]]:
     """
-    SV SUMMARY,L2300902/L2300901,Total number of structural variants (PASS),753
-    SV SUMMARY,L2300902/L2300901,Number of deletions (PASS),511,67.86
-    SV SUMMARY,L2300902/L2300901,Number of insertions (PASS),71,9.43
-    SV SUMMARY,L2300902/L2300901,Number of duplications (PASS),51,6.77
-    SV SUMMARY,L2300902/L2300901,Number of breakend pairs (PASS),120,15.94
+    Read a DRAGEN csv with a header row (such as hrdscore.csv) into a list of rows
     """
-    sv_metrics_file_name = FILENAME_BY_METRIC["SV_METRICS"].format(
-        SAMPLE_NAME=sample_name
-    )
-    sv_metrics_df = read_csv_from_s3(
-        f"{output_uri}{sv_metrics_file_name}",
-        header=None,
-        names=[
-            "summary", "sample", "metric", "value", "pct"
-        ],
-    )
-
-    if sv_metrics_df is None or sv_metrics_df.empty:
-        return None
-
+    return [
+        {
+            key: to_metric_value(value) if value is not None else None
+            for key, value in row.items()
+        }
+        for row in csv.DictReader(csv_content.splitlines())
+    ]
 
-    return sv_metrics_df.query("metric == 'Total number of structural variants (PASS)'")["value"].item()
 
-
-def get_cnv_estimated_tumor_purity(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[float]:
+class RemoteCacheTier(Protocol):
     """
-    CNV SUMMARY,,Bases in reference genome,3217346917
-    CNV SUMMARY,,Average alignment coverage over genome,74.43
-    CNV SUMMARY,,Number of alignment records,2009441813
-    CNV SUMMARY,,Number of filtered records (total),409892023,20.40
-    CNV SUMMARY,,Number of filtered records (duplicates),289145549,14.39
-    CNV SUMMARY,,Number of filtered records (MAPQ),92253320,4.59
-    CNV SUMMARY,,Number of filtered records (unmapped),39463101,1.96
-    CNV SUMMARY,,PMAD,0.101298
-    CNV SUMMARY,,OutlierBafFraction,0.004856
-    CNV SUMMARY,,Number of target intervals,2441305
-    CNV SUMMARY,,Number of segments,695
-    CNV SUMMARY,,Number of amplifications,94
-    CNV SUMMARY,,Number of deletions,118
-    CNV SUMMARY,,Number of passing amplifications,79,84.04
-    CNV SUMMARY,,Number of passing deletions,70,59.32
-    CNV SUMMARY,,Estimated tumor purity,0.60
-    CNV SUMMARY,,Diploid coverage,278.00
-    CNV SUMMARY,,Overall ploidy,2.06
-    CNV SUMMARY,,Homozygosity index,0.091
+    A shared cache tier (such as an S3 prefix or a DynamoDB table) that sits behind the /tmp tier,
+    so that retries landing on a fresh Lambda container can also skip the download.
+    Assign an implementation to METRICS_CACHE.remote_tier to enable it.
     """
-    cnv_metrics_file_name = FILENAME_BY_METRIC["CNV_METRICS"].format(
-        SAMPLE_NAME=sample_name
-    )
-    cnv_metrics_df = read_csv_from_s3(
-        f"{output_uri}{cnv_metrics_file_name}",
-        header=None,
-        names=[
-            "summary", "sample", "metric", "value", "pct"
-        ],
-    )
-
-    if cnv_metrics_df is None or cnv_metrics_df.empty:
-        return None
 
-    return na_round(
-        cnv_metrics_df.query("metric == 'Estimated tumor purity'")["value"].item(),
-        4
-    )
+    def get(self, cache_key: str) -> Optional[bytes]: ...
 
+    def put(self, cache_key: str, value: bytes): ...
 
-def get_cnv_overall_ploidy(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[float]:
-    """
-    CNV SUMMARY,,Bases in reference genome,3217346917
-    CNV SUMMARY,,Average alignment coverage over genome,74.43
-    CNV SUMMARY,,Number of alignment records,2009441813
-    CNV SUMMARY,,Number of filtered records (total),409892023,20.40
-    CNV SUMMARY,,Number of filtered records (duplicates),289145549,14.39
-    CNV SUMMARY,,Number of filtered records (MAPQ),92253320,4.59
-    CNV SUMMARY,,Number of filtered records (unmapped),39463101,1.96
-    CNV SUMMARY,,PMAD,0.101298
-    CNV SUMMARY,,OutlierBafFraction,0.004856
-    CNV SUMMARY,,Number of target intervals,2441305
-    CNV SUMMARY,,Number of segments,695
-    CNV SUMMARY,,Number of amplifications,94
-    CNV SUMMARY,,Number of deletions,118
-    CNV SUMMARY,,Number of passing amplifications,79,84.04
-    CNV SUMMARY,,Number of passing deletions,70,59.32
-    CNV SUMMARY,,Estimated tumor purity,0.60
-    CNV SUMMARY,,Diploid coverage,278.00
-    CNV SUMMARY,,Overall ploidy,2.06
-    CNV SUMMARY,,Homozygosity index,0.091
-    """
-    cnv_metrics_file_name = FILENAME_BY_METRIC["CNV_METRICS"].format(
-        SAMPLE_NAME=sample_name
-    )
-    cnv_metrics_df = read_csv_from_s3(
-        f"{output_uri}{cnv_metrics_file_name}",
-        header=None,
-        names=[
-            "summary", "sample", "metric", "value", "pct"
-        ],
-    )
-
-    if cnv_metrics_df is None or cnv_metrics_df.empty:
-        return None
 
-    return na_round(
-        cnv_metrics_df.query("metric == 'Overall ploidy'")["value"].item(),
-        4
-    )
+class MetricsCache:
+    """
+    Size-bounded LRU cache of parsed DRAGEN metrics on local disk, with an optional remote tier.
 
+    Entries are keyed by the s3 uri and the ETag / version id of the object, so a cached value
+    can never be served for an object that has since changed.
+    """
 
-def get_avg_cov_over_genome(
-        output_uri: str,
-        sample_name: str,
-        is_tumor: bool = False
-) -> Optional[float]:
+    def __init__(
+            self,
+            cache_dir: Path,
+            max_size_bytes: int,
+            remote_tier: Optional[RemoteCacheTier] = None
+    ):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.remote_tier = remote_tier
+        self._lock = Lock()
+
+    @staticmethod
+    def get_cache_key(file_obj: Dict[str, Any], *key_parts: Any) -> Optional[str]:
+        """
+        Build the cache key for a filemanager object record
+        :param file_obj: The filemanager object record
+        :param key_parts: Anything else that determines the cached value (i.e. the json paths extracted)
+        :return: The cache key, or None if the object has no ETag or version id to validate against
+        """
+        if not file_obj.get("eTag") and not file_obj.get("versionId"):
+            return None
+        return hashlib.sha256(json.dumps(
+            [
+                f"s3://{file_obj.get('bucket')}/{file_obj.get('key')}",
+                file_obj.get("eTag"),
+                file_obj.get("versionId"),
+                *key_parts
+            ],
+            sort_keys=True
+        ).encode()).hexdigest()
+
+    def get(self, cache_key: Optional[str]) -> Tuple[bool, Any]:
+        """
+        :return: (hit, value)
+        """
+        if cache_key is None:
+            return False, None
+
+        cache_path = self.cache_dir / f"{cache_key}.json"
+        try:
+            value_bytes = cache_path.read_bytes()
+            # Bump the mtime, the eviction order is least recently used first
+            os.utime(cache_path)
+            return True, json.loads(value_bytes)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if self.remote_tier is None:
+            return False, None
+
+        try:
+            value_bytes = self.remote_tier.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Could not read {cache_key} from the remote metrics cache: {e}")
+            return False, None
+
+        if value_bytes is None:
+            return False, None
+
+        try:
+            value = json.loads(value_bytes)
+        except ValueError as e:
+            logger.warning(f"Could not decode {cache_key} from the remote metrics cache, ignoring it: {e}")
+            return False, None
+
+        self._put_local(cache_key, value_bytes)
+        return True, value
+
+    def put(self, cache_key: Optional[str], value: Any):
+        if cache_key is None:
+            return
+
+        value_bytes = json.dumps(value).encode()
+        self._put_local(cache_key, value_bytes)
+
+        if self.remote_tier is None:
+            return
+
+        try:
+            self.remote_tier.put(cache_key, value_bytes)
+        except Exception as e:
+            logger.warning(f"Could not write {cache_key} to the remote metrics cache: {e}")
+
+    def _put_local(self, cache_key: str, value_bytes: bytes):
+        if len(value_bytes) > self.max_size_bytes:
+            return
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so that concurrent readers never see a partial entry
+            tmp_path = self.cache_dir / f"{cache_key}.json.tmp"
+            tmp_path.write_bytes(value_bytes)
+            tmp_path.replace(self.cache_dir / f"{cache_key}.json")
+            self._evict()
+
+    def _evict(self):
+        """
+        Drop the least recently used entries until the cache fits within max_size_bytes
+        """
+        cache_entries = []
+        for cache_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = cache_path.stat()
+            except FileNotFoundError:
+                continue
+            cache_entries.append((stat.st_mtime, stat.st_size, cache_path))
+
+        total_size = sum(size for _, size, _ in cache_entries)
+        for _, size, cache_path in sorted(cache_entries, key=lambda entry_iter_: entry_iter_[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            cache_path.unlink(missing_ok=True)
+            total_size -= size
+
+
+METRICS_CACHE = MetricsCache(METRICS_CACHE_DIR, METRICS_CACHE_MAX_SIZE_BYTES)
+
+
+def get_s3_uri_from_file_obj(file_obj: Dict[str, Any]) -> str:
+    return f"s3://{file_obj['bucket']}/{file_obj['key']}"
+
+
+def get_manifest_from_s3_uri(output_uri: str) -> Dict[str, Dict[str, Any]]:
     """
-    COVERAGE SUMMARY,,Aligned bases,239749015107
-    COVERAGE SUMMARY,,Aligned bases in genome,239749015107,100.00
-    COVERAGE SUMMARY,,Average alignment coverage over genome,79.31
-    COVERAGE SUMMARY,,Uniformity of coverage (PCT > 0.2*mean) over genome,93.95
-    COVERAGE SUMMARY,,Uniformity of coverage (PCT > 0.4*mean) over genome,93.05
-    COVERAGE SUMMARY,,PCT of genome with coverage [1500x: inf),0.01
-    COVERAGE SUMMARY,,PCT of genome with coverage [1000x: inf),0.01
-    COVERAGE SUMMARY,,PCT of genome with coverage [ 500x: inf),0.02
-    COVERAGE SUMMARY,,PCT of genome with coverage [ 100x: inf),17.62
-    COVERAGE SUMMARY,,PCT of genome with coverage [  50x: inf),88.64
-    COVERAGE SUMMARY,,PCT of genome with coverage [  20x: inf),93.75
-    COVERAGE SUMMARY,,PCT of genome with coverage [  15x: inf),94.01
-    COVERAGE SUMMARY,,PCT of genome with coverage [  10x: inf),94.30
-    COVERAGE SUMMARY,,PCT of genome with coverage [   3x: inf),94.95
-    COVERAGE SUMMARY,,PCT of genome with coverage [   1x: inf),95.41
-    COVERAGE SUMMARY,,PCT of genome with coverage [   0x: inf),100.00
-    COVERAGE SUMMARY,,PCT of genome with coverage [1000x:1500x),0.00
-    COVERAGE SUMMARY,,PCT of genome with coverage [ 500x:1000x),0.01
-    COVERAGE SUMMARY,,PCT of genome with coverage [ 100x: 500x),17.60
-    COVERAGE SUMMARY,,PCT of genome with coverage [  50x: 100x),71.02
-    COVERAGE SUMMARY,,PCT of genome with coverage [  20x:  50x),5.11
-    COVERAGE SUMMARY,,PCT of genome with coverage [  15x:  20x),0.25
-    COVERAGE SUMMARY,,PCT of genome with coverage [  10x:  15x),0.29
-    COVERAGE SUMMARY,,PCT of genome with coverage [   3x:  10x),0.65
-    COVERAGE SUMMARY,,PCT of genome with coverage [   1x:   3x),0.46
-    COVERAGE SUMMARY,,PCT of genome with coverage [   0x:   1x),4.59
-    COVERAGE SUMMARY,,Median chr X coverage (ignore 0x regions) over genome,85.00
-    COVERAGE SUMMARY,,Median chr Y coverage (ignore 0x regions) over genome,2.00
-    COVERAGE SUMMARY,,Average mitochondrial coverage over genome,17866.66
-    COVERAGE SUMMARY,,Average autosomal coverage over genome,82.16
-    COVERAGE SUMMARY,,Median autosomal coverage over genome,83.00
-    COVERAGE SUMMARY,,Mean/Median autosomal coverage ratio over genome,0.99
-    COVERAGE SUMMARY,,Aligned reads,1601182730
-    COVERAGE SUMMARY,,Aligned reads in genome,1601182730,100.00
+    List everything under an output prefix with a single filemanager query
+    :param output_uri: The s3 uri of the output directory
+    :return: s3 uri -> filemanager object record
     """
-    if is_tumor:
-        mapping_metrics_file_name = FILENAME_BY_METRIC["TUMOR_MAPPING_METRICS"].format(
-            SAMPLE_NAME=sample_name
-        )
-    else:
-        mapping_metrics_file_name = FILENAME_BY_METRIC["MAPPING_METRICS"].format(
-            SAMPLE_NAME=sample_name
+    output_uri_obj = urlparse(output_uri)
+    return dict(map(
+        lambda file_obj_iter_: (get_s3_uri_from_file_obj(file_obj_iter_), file_obj_iter_),
+        list_files_recursively(
+            output_uri_obj.netloc,
+            output_uri_obj.path.lstrip("/")
         )
-    mapping_metrics_df = read_csv_from_s3(
-        f"{output_uri}{mapping_metrics_file_name}",
-        header=None,
-        names=[
-            "summary", "region", "metric", "value", "pct"
-        ],
-    )
-
-    if mapping_metrics_df is None or mapping_metrics_df.empty:
-        return None
-
-    return na_round(
-        mapping_metrics_df.query("metric == 'Average autosomal coverage over genome'")["value"].item(),
-        4
-    )
+    ))
 
 
-def get_contamination_rate(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[float]:
+def read_file_from_s3(file_obj: Dict[str, Any]) -> str:
     """
-    Get the contamination rate from the metrics.json file
+    Download a file given its filemanager object record
     """
-    metrics_file_name = FILENAME_BY_METRIC["METRICS_JSON"].format(
-        SAMPLE_NAME=sample_name
-    )
+    response = HTTP_SESSION.get(get_presigned_url(file_obj['s3ObjectId']))
+    response.raise_for_status()
+    return response.text
 
-    # Read metrics json
-    metrics_json = read_json_from_s3(f"{output_uri}{metrics_file_name}")
 
-    if metrics_json is None:
-        return None
-
-    return na_round(
-        metrics_json.get("modules", {}).get("mapAlign", {}).get("globalMetrics", {}).get("estimatedSampleContamination", {}).get("value"),
-        4
-    )
-
-
-def get_duplication_rate(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[float]:
+def read_csv_from_s3(file_obj: Dict[str, Any], file_format: str, parse_func: Callable[[str], Any]) -> Any:
     """
-    Get the duplication rate from the metrics.json file
+    Download and parse a DRAGEN csv file given its filemanager object record
+    :param file_obj: The filemanager object record
+    :param file_format: The format of the file (see FILE_FORMAT_BY_METRIC), part of the cache key
+    :param parse_func: Parses the csv content, i.e. read_dragen_metrics_csv
+    :return: The parsed csv
     """
-    metrics_file_name = FILENAME_BY_METRIC["METRICS_JSON"].format(
-        SAMPLE_NAME=sample_name
-    )
+    # Skip the download and the parse if we have already parsed this version of the object
+    cache_key = METRICS_CACHE.get_cache_key(file_obj, file_format)
+    is_cache_hit, parsed_csv = METRICS_CACHE.get(cache_key)
+    if is_cache_hit:
+        return parsed_csv
 
-    metrics_json = read_json_from_s3(f"{output_uri}{metrics_file_name}")
+    parsed_csv = parse_func(read_file_from_s3(file_obj))
 
-    if metrics_json is None:
-        return None
+    METRICS_CACHE.put(cache_key, parsed_csv)
 
-    return na_round(
-        metrics_json.get("modules", {}).get("mapAlign", {}).get("globalMetrics", {}).get("duplicateMarkedReads", {}).get("percentage") / 100,
-        4
-    )
+    return parsed_csv
 
 
-def get_total_variants(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[int]:
-    """
-    Get the total variants from the metrics.json file
+def read_json_paths_from_s3(file_obj: Dict[str, Any], json_paths: List[str]) -> Dict[str, Any]:
     """
-    metrics_file_name = FILENAME_BY_METRIC["METRICS_JSON"].format(
-        SAMPLE_NAME=sample_name
-    )
+    Stream a json file from s3 and collect the scalar values at the given paths.
 
-    metrics_json = read_json_from_s3(f"{output_uri}{metrics_file_name}")
-
-    if metrics_json is None:
-        return None
+    Paths are dot-separated (i.e. 'modules.mapAlign.globalMetrics.duplicateMarkedReads.percentage'),
+    the body is parsed incrementally and the download is dropped as soon as every path has been found,
+    so the whole document is never held in memory.
+    Paths that are not in the document are returned as None.
+    """
+    # Skip the download if we have already extracted these paths from this version of the object
+    cache_key = METRICS_CACHE.get_cache_key(file_obj, "json_paths", sorted(json_paths))
+    is_cache_hit, json_values = METRICS_CACHE.get(cache_key)
+    if is_cache_hit:
+        # The cached entry may have been written for the same paths in another order
+        return {
+            json_path: json_values.get(json_path)
+            for json_path in json_paths
+        }
+
+    json_values = dict.fromkeys(json_paths)
+    remaining_paths = set(json_paths)
+
+    with HTTP_SESSION.get(get_presigned_url(file_obj['s3ObjectId']), stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            if event not in JSON_SCALAR_EVENTS or prefix not in remaining_paths:
+                continue
+            json_values[prefix] = value
+            remaining_paths.remove(prefix)
+            if not remaining_paths:
+                break
+
+    METRICS_CACHE.put(cache_key, json_values)
+
+    return json_values
+
+
+class DragenArtifactLoader:
+    """
+    Per-invocation loader for the DRAGEN output files of a single sample.
 
-    return metrics_json.get("modules", {}).get("variantCaller", {}).get("postFilter", {}).get(sample_name, {}).get("totalVariants", {}).get("value")
+    Each file is fetched and parsed at most once, every metric is then read
+    from the parsed object held in memory (including files that do not exist).
+    """
 
+    def __init__(self, output_uri: str, sample_name: str):
+        self.output_uri = output_uri
+        self.sample_name = sample_name
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._manifest_lock = Lock()
+        self._artifacts: Dict[str, Any] = {}
+
+    def get_uri(self, file_key: str) -> str:
+        """
+        Get the s3 uri of a DRAGEN output file
+        :param file_key: The key of the file in FILENAME_BY_METRIC
+        :return: The s3 uri of the file
+        """
+        return self.output_uri + FILENAME_BY_METRIC[file_key].format(
+            SAMPLE_NAME=self.sample_name
+        )
 
-def get_ti_tv_ratio(
-        output_uri: str,
-        sample_name: str,
-) -> Optional[float]:
+    def get_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        The output directory is listed once, every existence check and presign request
+        is then resolved from this index rather than a filemanager lookup per file
+        """
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._manifest = get_manifest_from_s3_uri(self.output_uri)
+        return self._manifest
+
+    def get_file_obj(self, file_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the filemanager object record of a DRAGEN output file, or None if the file does not exist
+        """
+        return self.get_manifest().get(self.get_uri(file_key))
+
+    def load_csv(self, file_key: str, parse_func: Callable[[str], Any]) -> Any:
+        """
+        Read and parse a DRAGEN csv file, or None if the file does not exist
+        """
+        if file_key not in self._artifacts:
+            file_obj = self.get_file_obj(file_key)
+            self._artifacts[file_key] = (
+                read_csv_from_s3(file_obj, FILE_FORMAT_BY_METRIC[file_key], parse_func)
+                if file_obj is not None
+                else None
+            )
+        return self._artifacts[file_key]
+
+    def load_metrics_csv(self, file_key: str) -> Optional[Dict[str, Optional[Union[int, float, str]]]]:
+        """
+        Read a headerless DRAGEN summary csv file into a metric -> value index
+        """
+        return self.load_csv(file_key, read_dragen_metrics_csv)
+
+    def load_table_csv(self, file_key: str) -> Optional[List[Dict[str, Optional[Union[int, float, str]]]]]:
+        """
+        Read a DRAGEN csv file with a header row into a list of rows
+        """
+        return self.load_csv(file_key, read_dragen_table_csv)
+
+    def load_json_paths(self, file_key: str, json_paths: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Stream the given paths out of a DRAGEN json file,
+        the returned dict is keyed by the (unformatted) paths
+        """
+        json_values = self._artifacts.get(file_key, {})
+        missing_json_paths = [
+            json_path for json_path in json_paths
+            if json_values is not None and json_path not in json_values
+        ]
+        if missing_json_paths:
+            file_obj = self.get_file_obj(file_key)
+            if file_obj is None:
+                json_values = None
+            else:
+                streamed_json_values = read_json_paths_from_s3(
+                    file_obj,
+                    [json_path.format(SAMPLE_NAME=self.sample_name) for json_path in missing_json_paths]
+                )
+                json_values = {
+                    **json_values,
+                    **{
+                        json_path: streamed_json_values.get(json_path.format(SAMPLE_NAME=self.sample_name))
+                        for json_path in missing_json_paths
+                    }
+                }
+            self._artifacts[file_key] = json_values
+        return json_values
+
+    def extract(self, file_key: str, selectors: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Pull the values for all selectors out of a DRAGEN output file in one pass
+        :param file_key: The key of the file in FILENAME_BY_METRIC
+        :param selectors: Metric names, column names or json paths (see FILE_FORMAT_BY_METRIC)
+        :return: selector -> value, or None if the file does not exist
+        """
+        file_format = FILE_FORMAT_BY_METRIC[file_key]
+
+        if file_format == "json":
+            return self.load_json_paths(file_key, selectors)
+
+        if file_format == "table_csv":
+            table_rows = self.load_table_csv(file_key)
+            if table_rows is None:
+                return None
+            sample_row = next(
+                (
+                    row_iter_
+                    for row_iter_ in table_rows
+                    if str(row_iter_.get("Sample")) == self.sample_name
+                ),
+                {}
+            )
+            return {
+                selector: sample_row.get(selector)
+                for selector in selectors
+            }
+
+        metrics_index = self.load_metrics_csv(file_key)
+        if metrics_index is None:
+            return None
+        return {
+            selector: metrics_index.get(selector)
+            for selector in selectors
+        }
+
+
+def build_metric_plan(is_tumor: bool) -> Dict[str, List[MetricSpec]]:
     """
-    Get the ti/tv ratio from the metrics.json file
+    Group the metrics that apply to this sample type by their source file
+    :param is_tumor: Is this the tumor sample
+    :return: file_key -> metric specs
     """
-    metrics_file_name = FILENAME_BY_METRIC["METRICS_JSON"].format(
-        SAMPLE_NAME=sample_name
-    )
-
-    metrics_json = read_json_from_s3(f"{output_uri}{metrics_file_name}")
-
-    if metrics_json is None:
-        return None
+    metric_plan: Dict[str, List[MetricSpec]] = {}
+    for metric_spec in METRIC_REGISTRY:
+        if metric_spec.get("tumor_only", False) and not is_tumor:
+            continue
+        if metric_spec.get("germline_only", False) and is_tumor:
+            continue
+        metric_plan.setdefault(metric_spec["file_key"], []).append(metric_spec)
+    return metric_plan
+
+
+def collect_metrics(
+        sample_plans: List[Tuple[DragenArtifactLoader, Dict[str, List[MetricSpec]]]]
+) -> List[Dict[str, Any]]:
+    """
+    Collect every metric in the plan of each sample.
 
-    return na_round(
-        metrics_json.get("modules", {}).get("variantCaller", {}).get("postFilter", {}).get(sample_name, {}).get("tiTvRatio", {}).get("value"),
-        4
-    )
+    Source files of all samples are fetched concurrently from the one pool so that the fetch stage takes
+    as long as the slowest file rather than the sum of all files,
+    each file is only read once regardless of how many metrics it holds.
+    :param sample_plans: List of (artifact loader, metric plan) for each sample
+    :return: tag_name -> value (None where the file or metric is not available) for each sample
+    """
+    extraction_tasks = [
+        (artifact_loader, file_key, [metric_spec["selector"] for metric_spec in metric_specs])
+        for artifact_loader, metric_plan in sample_plans
+        for file_key, metric_specs in metric_plan.items()
+    ]
+
+    if not extraction_tasks:
+        return [{} for _ in sample_plans]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(extraction_tasks))) as executor:
+        file_values_iter = iter(list(executor.map(
+            lambda extraction_task_iter_: extraction_task_iter_[0].extract(
+                extraction_task_iter_[1],
+                extraction_task_iter_[2]
+            ),
+            extraction_tasks
+        )))
+
+    # Results are in the same order as the tasks, so we can walk the plans again to pair them up
+    tags_list = []
+    for _, metric_plan in sample_plans:
+        tags = {}
+        for metric_specs in metric_plan.values():
+            file_values = next(file_values_iter)
+            for metric_spec in metric_specs:
+                value = file_values.get(metric_spec["selector"]) if file_values is not None else None
+                transform = metric_spec.get("transform")
+                tags[metric_spec["tag_name"]] = transform(value) if transform is not None else value
+        tags_list.append(tags)
+
+    return tags_list
 
 
 def snake_to_camel(s: str) -> str:
@@ -415,37 +684,10 @@ def snake_to_camel(s: str) -> str:
     return parts[0] + ''.join(word.capitalize() for word in parts[1:])
 
 
-def handler(event, context):
+def format_tags(tags: Dict[str, Any], is_tumor: bool) -> Dict[str, Any]:
     """
-    Add the post analysis tags to the event
+    Prefix tumor tags with 'tumor', convert the keys to camelCase and drop any missing values
     """
-
-    # Get the inputs
-    sample_name = event.get("variantCallingSampleName")
-    output_uri = event.get("variantCallingOutputUri")
-    is_tumor = event.get("isTumor", False)
-
-    if not sample_name or not output_uri:
-        raise ValueError("Missing required inputs")
-
-    tags = {}
-
-    # Get the metrics
-    if is_tumor:
-        tags["hrd_score"] = get_hrd_score(output_uri, sample_name)
-        tags["tmb_score"] = get_tmb_score(output_uri, sample_name)
-        tags["sv_pass_count"] = get_sv_pass_count(output_uri, sample_name)
-        tags["cnv_estimated_tumor_purity"] = get_cnv_estimated_tumor_purity(output_uri, sample_name)
-        tags["cnv_overall_ploidy"] = get_cnv_overall_ploidy(output_uri, sample_name)
-        tags["avg_autosomal_coverage_over_genome"] = get_avg_cov_over_genome(output_uri, sample_name, is_tumor=True)
-    else:
-        tags["avg_autosomal_coverage_over_genome"] = get_avg_cov_over_genome(output_uri, sample_name, is_tumor=False)
-
-    tags["contamination_rate"] = get_contamination_rate(output_uri, sample_name)
-    tags["duplication_frac"] = get_duplication_rate(output_uri, sample_name)
-    tags["total_post_filter_variants"] = get_total_variants(output_uri, sample_name)
-    tags["ti_tv_ratio"] = get_ti_tv_ratio(output_uri, sample_name)
-
     if is_tumor:
         # Prepend 'tumor_' to the keys
         tags = dict(map(
@@ -460,11 +702,76 @@ def handler(event, context):
     ))
 
     # Drop any None values
-    tags = dict(filter(
+    return dict(filter(
         lambda item: item[1] is not None,
         tags.items()
     ))
 
+
+def handler(event, context):
+    """
+    Add the post analysis tags to the event
+
+    Input (single sample):
+    {
+        "variantCallingSampleName": "L2300902",
+        "variantCallingOutputUri": "s3://.../",
+        "isTumor": true  (optional)
+    }
+
+    Input (batch):
+    {
+        "samples": [
+            {
+                "sampleName": "L2300901",
+                "outputUri": "s3://.../",
+                "isTumor": false
+            },
+            {
+                "sampleName": "L2300902",
+                "outputUri": "s3://.../",
+                "isTumor": true
+            }
+        ]
+    }
+
+    Output:
+    {
+        "tags": {...}  (tags of all samples merged, tumor tags are prefixed with 'tumor')
+    }
+    """
+
+    # Get the inputs
+    samples = event.get("samples")
+    if samples is None:
+        samples = [
+            {
+                "sampleName": event.get("variantCallingSampleName"),
+                "outputUri": event.get("variantCallingOutputUri"),
+                "isTumor": event.get("isTumor", False),
+            }
+        ]
+
+    if not samples or any(
+            not sample_iter_.get("sampleName") or not sample_iter_.get("outputUri")
+            for sample_iter_ in samples
+    ):
+        raise ValueError("Missing required inputs")
+
+    # Each DRAGEN output file is downloaded and parsed at most once for this invocation
+    sample_plans = list(map(
+        lambda sample_iter_: (
+            DragenArtifactLoader(sample_iter_["outputUri"], sample_iter_["sampleName"]),
+            build_metric_plan(sample_iter_.get("isTumor", False))
+        ),
+        samples
+    ))
+
+    # Get the metrics
+    tags = {}
+    for sample, sample_tags in zip(samples, collect_metrics(sample_plans)):
+        tags.update(format_tags(sample_tags, is_tumor=sample.get("isTumor", False)))
+
     # Return the tags
     return {
         "tags": tags
@@ -4,29 +4,85 @@
 Compare the payload of the original draft event and the newly constructed object.
 
 We don't want to end up in an infinite loop, so we only emit a WRU event if the payload has actually changed.
+
+Payloads are compared by a digest of their canonical JSON form, which does not depend on key order
+or on how a number was formatted (1 and 1.0 are the same JSON number).
+The digest of the new payload is returned so that it can be kept and compared against directly next time.
+
+The update event always carries the full payload, as the Workflow Manager requires it,
+so no patch between the old and new payloads is computed here.
 """
 
-from deepdiff import DeepDiff
+# Standard imports
+import hashlib
+import json
+import math
+from typing import Any
+
+
+def get_canonical_value(value: Any) -> Any:
+    """
+    Normalise a JSON value so that equal JSON values serialise identically,
+    integral floats become ints, every other float keeps its shortest round-trip repr
+    """
+    if isinstance(value, dict):
+        return {
+            str(key): get_canonical_value(sub_value)
+            for key, sub_value in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return list(map(get_canonical_value, value))
+    if isinstance(value, float) and not isinstance(value, bool):
+        if not math.isfinite(value):
+            raise ValueError(f"Payloads cannot contain non-finite numbers, got {value}")
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def get_payload_digest(payload: Any) -> str:
+    """
+    Get the sha256 digest of the canonical JSON form of a payload
+    :param payload: The payload
+    :return: The hex digest
+    """
+    return hashlib.sha256(
+        json.dumps(
+            get_canonical_value(payload),
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            allow_nan=False
+        ).encode()
+    ).hexdigest()
 
 
 def handler(event, context):
     """
-    Compare old and new payload using deep equality.
+    Compare old and new payload by their canonical digests.
+    If the digest of the old payload is already known it can be given instead of the old payload.
 
     Input:
     {
         "oldPayload": {...},
+        "oldPayloadDigest": "...",  # Optional, used instead of oldPayload
         "newPayload": {...}
     }
 
     Output:
     {
-        "hasChanged": true/false
+        "hasChanged": true/false,
+        "payloadDigest": "..."  # The digest of the new payload
     }
     """
-    old_payload = event['oldPayload']
-    new_payload = event['newPayload']
+    old_payload_digest = (
+        event['oldPayloadDigest']
+        if event.get('oldPayloadDigest')
+        else get_payload_digest(event['oldPayload'])
+    )
+    new_payload_digest = get_payload_digest(event['newPayload'])
 
-    if not DeepDiff(old_payload, new_payload):
-        return {"hasChanged": False}
-    return {"hasChanged": True}
+    return {
+        "hasChanged": old_payload_digest != new_payload_digest,
+        "payloadDigest": new_payload_digest,
+    }
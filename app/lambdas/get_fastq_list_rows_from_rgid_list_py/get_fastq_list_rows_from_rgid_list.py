@@ -8,9 +8,12 @@ Input is fastqRgidList
 Output is fastqListRows (list)
 """
 # Standard imports
+from typing import Any, Callable, Dict, Optional
 from urllib.parse import urlparse
 from pathlib import Path
 from os import environ
+import json
+import logging
 from requests import HTTPError
 
 # Layer imports
@@ -19,20 +22,49 @@ from orcabus_api_tools.fastq import to_fastq_list_row, get_fastq_by_rgid
 # Globals
 TEST_DATA_BUCKET_NAME_ENV_VAR = "TEST_DATA_BUCKET_NAME"
 
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
-def is_fastq_id_in_test_data_project(fastq_id: str) -> bool:
+
+def get_memoised_result(
+        memo: Dict[str, Any],
+        memo_stats: Dict[str, Dict[str, int]],
+        func: Callable,
+        *args,
+        **kwargs
+) -> Any:
+    """
+    Return the result of an OrcaBus API read from the invocation's memo, or run the read and memoise it.
+    Reads in this handler run one after another, so a plain dict is enough. Exceptions are not memoised.
+    :param memo: The memo of this invocation, keyed by function name + arguments
+    :param memo_stats: The per-function hit / miss counters of this invocation
+    :param func: The read
+    :return: The result of the read
+    """
+    cache_key = json.dumps([func.__name__, args, kwargs], sort_keys=True, default=str)
+    func_stats = memo_stats.setdefault(func.__name__, {"hits": 0, "misses": 0})
+
+    if cache_key in memo:
+        func_stats['hits'] += 1
+        return memo[cache_key]
+
+    func_stats['misses'] += 1
+    memo[cache_key] = func(*args, **kwargs)
+    return memo[cache_key]
+
+
+def get_test_data_fastq_list_row(fastq_id: str) -> Optional[Dict[str, Any]]:
     """
-    Determines if fastq id is in the test data project
+    Get the fastq list row of a fastq id in the test data project
+    :return: The fastq list row, or None if the fastq id is not in the test data project
     """
     try:
-        to_fastq_list_row(
+        return to_fastq_list_row(
             fastq_id,
             bucket=environ[TEST_DATA_BUCKET_NAME_ENV_VAR]
         )
     except HTTPError:
-        return False
-
-    return True
+        return None
 
 
 def handler(event, context):
@@ -54,9 +86,13 @@ def handler(event, context):
         else None
     )
 
+    # Fresh memo for this invocation
+    memo: Dict[str, Any] = {}
+    memo_stats: Dict[str, Dict[str, int]] = {}
+
     # Collect all fastq ids from the rgid list
     all_fastq_ids = sorted(list(map(
-        lambda fastq_rgid_iter_: get_fastq_by_rgid(fastq_rgid_iter_)['id'],
+        lambda fastq_rgid_iter_: get_memoised_result(memo, memo_stats, get_fastq_by_rgid, fastq_rgid_iter_)['id'],
         fastq_rgid_list
     )))
 
@@ -65,19 +101,18 @@ def handler(event, context):
     non_test_data_fastq_list_ids = []
     test_data_fastq_list_rows = []
     for fastq_id_iter_ in all_fastq_ids:
-        if not is_fastq_id_in_test_data_project(fastq_id_iter_):
+        test_data_fastq_list_row = get_memoised_result(
+            memo, memo_stats, get_test_data_fastq_list_row, fastq_id_iter_
+        )
+        if test_data_fastq_list_row is None:
             non_test_data_fastq_list_ids.append(fastq_id_iter_)
         else:
-            test_data_fastq_list_rows.append(
-                to_fastq_list_row(
-                    fastq_id_iter_,
-                    bucket=environ[TEST_DATA_BUCKET_NAME_ENV_VAR]
-                )
-            )
+            test_data_fastq_list_rows.append(test_data_fastq_list_row)
 
     # Re-collect the test-data fastq list rows with the s3 uri prefix if provided
     non_test_data_fastq_list_rows = list(map(
-        lambda fastq_id_iter_: to_fastq_list_row(
+        lambda fastq_id_iter_: get_memoised_result(
+            memo, memo_stats, to_fastq_list_row,
             fastq_id_iter_,
             **(
                 {
@@ -91,6 +126,8 @@ def handler(event, context):
         non_test_data_fastq_list_ids
     ))
 
+    logger.info(f"OrcaBus API reads: {json.dumps(memo_stats)}")
+
     return {
         "fastqListRows": test_data_fastq_list_rows + non_test_data_fastq_list_rows
     }
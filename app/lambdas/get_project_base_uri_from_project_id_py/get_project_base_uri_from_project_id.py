@@ -4,7 +4,8 @@
 Given an ICAv2 project id, get the base uri for that project
 """
 # Standard imports
-from typing import Dict
+from time import monotonic
+from typing import Dict, Optional, Tuple
 
 # Wrapica imports
 from wrapica.storage_configuration import get_s3_key_prefix_by_project_id
@@ -12,21 +13,50 @@ from wrapica.storage_configuration import get_s3_key_prefix_by_project_id
 # Layer imports
 from icav2_tools import set_icav2_env_vars
 
+# Globals
+# Project base uris are cached across warm invocations
+PROJECT_BASE_URI_CACHE_TTL_SECONDS = 900
+PROJECT_BASE_URI_CACHE: Dict[str, Tuple[float, str]] = {}
+
+
+def get_project_base_uri(project_id: str, refresh: bool = False) -> Optional[str]:
+    """
+    Get the s3 key prefix of the project, from the cache if it is younger than the ttl.
+    Failed (or empty) lookups are not cached.
+    :param project_id: The ICAv2 project id
+    :param refresh: Drop the cached prefix first, i.e. if it is suspected to be stale
+    :return: The project base uri
+    """
+    if refresh:
+        PROJECT_BASE_URI_CACHE.pop(project_id, None)
+
+    cache_entry = PROJECT_BASE_URI_CACHE.get(project_id)
+    if cache_entry is not None and monotonic() - cache_entry[0] < PROJECT_BASE_URI_CACHE_TTL_SECONDS:
+        return cache_entry[1]
+
+    project_base_uri = get_s3_key_prefix_by_project_id(project_id)
+    if project_base_uri is not None:
+        PROJECT_BASE_URI_CACHE[project_id] = (monotonic(), project_base_uri)
+
+    return project_base_uri
+
 
 def handler(event, context) -> Dict[str, str]:
     """
-    Given an ICAv2 project id, get the base uri for that project
+    Given an ICAv2 project id, get the base uri for that project,
+    set refresh to look the base uri up again rather than use the cached value
     """
     # Set env vars
     set_icav2_env_vars()
 
     # Inputs
     project_id = event.get("projectId", None)
+    refresh = event.get("refresh", False)
 
     # Check project id is not None:
     if project_id is None:
         raise ValueError("projectId is a required input")
 
     return {
-        "s3Uri": get_s3_key_prefix_by_project_id(project_id)
+        "s3Uri": get_project_base_uri(project_id, refresh=refresh)
     }
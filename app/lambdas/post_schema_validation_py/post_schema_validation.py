@@ -4,16 +4,26 @@
 Confirm that the data uris in the inputs and engine parameters are appropriate
 """
 # Imports
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from itertools import groupby
 from pathlib import Path
-from typing import Dict, Tuple, cast, TypedDict, List, Any
+from typing import Callable, Dict, Optional, Protocol, Set, Tuple, Union, cast, TypedDict, List, Any
+import hashlib
+import json
 import logging
 from os import environ
-from time import sleep
+from threading import Lock
+from time import monotonic, sleep
 from urllib.parse import urlparse
 
 # Wrapica imports
 from libica.openapi.v3 import ApiException
-from wrapica.project_data import coerce_data_id_or_uri_to_project_data_obj, get_project_data_obj_by_id
+from wrapica.project_data import (
+    coerce_data_id_or_uri_to_project_data_obj,
+    get_project_data_obj_by_id,
+    list_project_data_non_recursively
+)
 from wrapica.storage_configuration import get_s3_key_prefix_by_project_id
 from wrapica.project_pipelines import get_project_pipeline_obj
 from wrapica.project import get_project_obj_from_project_id
@@ -21,8 +31,10 @@ from wrapica.project import get_project_obj_from_project_id
 # Layer imports
 from orcabus_api_tools.workflow import add_comment_to_workflow_run, get_workflow_run
 from orcabus_api_tools.metadata import get_library_from_library_id
-from orcabus_api_tools.filemanager import get_s3_object_id_from_s3_uri, list_files_recursively
+from orcabus_api_tools.filemanager import get_s3_object_id_from_s3_uri
 from orcabus_api_tools.filemanager.errors import S3FileNotFoundError
+from orcabus_api_tools.filemanager.globals import S3_LIST_ENDPOINT
+from orcabus_api_tools.filemanager.request_helpers import get_file_manager_request
 from icav2_tools import set_icav2_env_vars
 
 # Globals
@@ -51,6 +63,28 @@ LOGS_MIDFIX = "logs"
 # Clinical workflow name
 CLINICAL_WORKFLOW_NAME = 'clinical'
 AUTOMATED_WORKFLOW_PREFIX = "umccr--automated"
+# Maximum number of data uris checked at once
+MAX_URI_CHECK_WORKERS = 8
+# A prefix shared by several uris is listed with one page of at most this many rows per uri,
+# prefixes holding more objects than that fall back to point lookups
+MAX_LISTING_ROWS_PER_URI = 4
+# ICAv2 project / pipeline / storage prefix lookups are cached across warm invocations
+ICAV2_METADATA_CACHE_TTL_SECONDS = 900
+ICAV2_METADATA_CACHE: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+ICAV2_METADATA_CACHE_LOCK = Lock()
+# Successful validation results are reused across warm invocations for an unchanged set of inputs
+VALIDATION_RESULT_STORE_TTL_SECONDS = 600
+# The tags that the validation depends on
+VALIDATION_TAG_KEYS = [
+    "tumorLibraryId",
+    "ntsmExternalPassing",
+    "ntsmInternalPassing",
+    "tumorNtsmInternalPassing",
+    "preLaunchCoverageEst",
+    "preLaunchDupFracEst",
+    "tumorPreLaunchCoverageEst",
+    "tumorPreLaunchDupFracEst",
+]
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -58,22 +92,282 @@ logger.setLevel(logging.INFO)
 # Comment formatting constants
 MAX_COMMENT_LENGTH = 1024
 TRUNCATION_SUFFIX = "\n... [truncated, see execution ARN for full detail]"
+COMMENT_SECTION_SEPARATOR = "\n\n"
+# Comments that cannot be consolidated are posted at most this often (token bucket)
+COMMENT_RATE_PER_SECOND = 1.0
+COMMENT_BURST = 1
+
+
+def _get_comment_footer(execution_arn: str) -> str:
+    return f"---\nStep Functions Execution: {execution_arn}"
+
+
+def _fits_comment_with_arn(body: str, execution_arn: str) -> bool:
+    """
+    Whether a comment fits in the 1024 char limit with the execution ARN footer, i.e. is not truncated
+    """
+    return len(body) + 1 + len(_get_comment_footer(execution_arn)) <= MAX_COMMENT_LENGTH
 
 
 def _format_comment_with_arn(body: str, execution_arn: str) -> str:
     """
     Append the execution ARN footer to a comment and enforce the 1024 char limit.
     """
-    footer = f"---\nStep Functions Execution: {execution_arn}"
+    footer = _get_comment_footer(execution_arn)
     full_comment = f"{body}\n{footer}"
 
-    if len(full_comment) > MAX_COMMENT_LENGTH:
+    if not _fits_comment_with_arn(body, execution_arn):
         available = MAX_COMMENT_LENGTH - len(footer) - len(TRUNCATION_SUFFIX) - 1
         full_comment = f"{body[:available]}{TRUNCATION_SUFFIX}\n{footer}"
 
     return full_comment
 
 
+class CommentTokenBucket:
+    """
+    Rate limit comment posting, time already spent posting counts towards the interval
+    rather than sleeping a fixed second after every comment
+    """
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = monotonic()
+
+    def acquire(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_second)
+        self.last_refill = now
+        if self.tokens < 1:
+            sleep((1 - self.tokens) / self.rate_per_second)
+            self.tokens = 1
+            self.last_refill = monotonic()
+        self.tokens -= 1
+
+
+class CommentOutbox:
+    """
+    Collect the workflow run comments of an invocation and post them in order on flush.
+
+    If all comments fit into a single comment (with the execution ARN footer), they are posted as one
+    multi-section comment, otherwise each comment is posted separately through a token bucket.
+    """
+    def __init__(self, workflow_run_id: str, execution_arn: str):
+        self.workflow_run_id = workflow_run_id
+        self.execution_arn = execution_arn
+        self.comments: List[str] = []
+        self.token_bucket = CommentTokenBucket(COMMENT_RATE_PER_SECOND, COMMENT_BURST)
+
+    def add(self, comment: str):
+        self.comments.append(comment)
+
+    def post(self, comment: str):
+        self.token_bucket.acquire()
+        add_comment_to_workflow_run(
+            workflow_run_orcabus_id=self.workflow_run_id,
+            comment=_format_comment_with_arn(comment, self.execution_arn),
+            author=COMMENT_AUTHOR
+        )
+
+    def flush(self):
+        comments, self.comments = self.comments, []
+        if len(comments) == 0:
+            return
+
+        # One comment if the consolidated comment would not be truncated
+        consolidated_comment = COMMENT_SECTION_SEPARATOR.join(comments)
+        if len(comments) == 1 or _fits_comment_with_arn(consolidated_comment, self.execution_arn):
+            self.post(consolidated_comment)
+            return
+
+        for comment in comments:
+            self.post(comment)
+
+
+class ValidationResultStore(Protocol):
+    """
+    Where successful validation results are kept, keyed by the validation cache key.
+    Assign a shared implementation (such as a DynamoDB table) to VALIDATION_RESULT_STORE
+    to keep the results beyond a single Lambda container.
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def put(self, key: str, value: Dict[str, Any]): ...
+
+
+class InMemoryValidationResultStore:
+    """
+    Keep the validation results in the warm Lambda container until they are older than the ttl,
+    expired entries are dropped on each put
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or monotonic() - entry[0] >= self.ttl_seconds:
+            return None
+        return entry[1]
+
+    def put(self, key: str, value: Dict[str, Any]):
+        now = monotonic()
+        for expired_key in list(filter(
+            lambda key_iter_: now - self.entries[key_iter_][0] >= self.ttl_seconds,
+            self.entries
+        )):
+            del self.entries[expired_key]
+        self.entries[key] = (now, value)
+
+
+VALIDATION_RESULT_STORE: ValidationResultStore = InMemoryValidationResultStore(VALIDATION_RESULT_STORE_TTL_SECONDS)
+
+
+class OrcabusApiMemo:
+    """
+    Memoise OrcaBus API reads for the lifetime of a single handler invocation,
+    keyed by function name + arguments, with per-function hit / miss counters.
+    Exceptions are not memoised.
+    """
+    def __init__(self):
+        self._results: Dict[str, Future] = {}
+        self._lock = Lock()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def __call__(self, func: Callable, *args, **kwargs) -> Any:
+        cache_key = json.dumps([func.__name__, args, kwargs], sort_keys=True, default=str)
+
+        # Concurrent callers of the same read wait on the first caller's result
+        with self._lock:
+            result_future = self._results.get(cache_key)
+            is_owner = result_future is None
+            if is_owner:
+                result_future = Future()
+                self._results[cache_key] = result_future
+                self.misses[func.__name__] += 1
+            else:
+                self.hits[func.__name__] += 1
+
+        if is_owner:
+            try:
+                result_future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                with self._lock:
+                    self._results.pop(cache_key, None)
+                result_future.set_exception(e)
+
+        return result_future.result()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return dict(map(
+            lambda func_name_iter_: (
+                func_name_iter_,
+                {"hits": self.hits[func_name_iter_], "misses": self.misses[func_name_iter_]}
+            ),
+            sorted(set(self.hits) | set(self.misses))
+        ))
+
+
+# Replaced at the start of each invocation
+ORCABUS_API_MEMO = OrcabusApiMemo()
+
+
+def get_validation_cache_key(
+        workflow_run_id: str,
+        engine_parameters: Dict[str, Any],
+        inputs: Dict[str, Any],
+        tags: Dict[str, Any]
+) -> str:
+    """
+    Canonical hash of everything the validation depends on,
+    so any change to the inputs, engine parameters or relevant tags results in a new key
+    """
+    return hashlib.sha256(json.dumps(
+        {
+            "workflowRunId": workflow_run_id,
+            "engineParameters": engine_parameters,
+            "inputs": inputs,
+            "tags": dict(filter(
+                lambda tag_iter_: tag_iter_[0] in VALIDATION_TAG_KEYS,
+                tags.items()
+            )),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    ).encode()).hexdigest()
+
+
+def invalidate_icav2_metadata(cache_key: Tuple[str, ...]):
+    """
+    Drop a cached ICAv2 lookup, i.e. when a lookup fails or a cached value is suspected to be stale
+    """
+    with ICAV2_METADATA_CACHE_LOCK:
+        ICAV2_METADATA_CACHE.pop(cache_key, None)
+
+
+def get_cached_icav2_metadata(cache_key: Tuple[str, ...], lookup_func: Callable[[], Any]) -> Any:
+    """
+    Return a cached ICAv2 lookup if it is younger than the ttl, otherwise run the lookup and cache the result.
+    Failed lookups (exceptions or None) are never cached, and evict any existing entry.
+    :param cache_key: The cache key, (lookup_type, *ids)
+    :param lookup_func: The uncached lookup
+    :return: The lookup value
+    """
+    with ICAV2_METADATA_CACHE_LOCK:
+        cache_entry = ICAV2_METADATA_CACHE.get(cache_key)
+    if cache_entry is not None and monotonic() - cache_entry[0] < ICAV2_METADATA_CACHE_TTL_SECONDS:
+        return cache_entry[1]
+
+    try:
+        value = lookup_func()
+    except Exception:
+        invalidate_icav2_metadata(cache_key)
+        raise
+
+    if value is None:
+        invalidate_icav2_metadata(cache_key)
+        return None
+
+    with ICAV2_METADATA_CACHE_LOCK:
+        ICAV2_METADATA_CACHE[cache_key] = (monotonic(), value)
+
+    return value
+
+
+def get_project_obj(project_id: str):
+    """
+    Get the ICAv2 project object, raises an ApiException if the project cannot be found
+    """
+    return get_cached_icav2_metadata(
+        ("project", project_id),
+        lambda: get_project_obj_from_project_id(project_id)
+    )
+
+
+def get_pipeline_obj(project_id: str, pipeline_id: str):
+    """
+    Get the ICAv2 pipeline object, raises a ValueError if the pipeline is not in the project
+    """
+    return get_cached_icav2_metadata(
+        ("pipeline", project_id, pipeline_id),
+        lambda: get_project_pipeline_obj(project_id=project_id, pipeline_id=pipeline_id)
+    )
+
+
+def get_project_prefix(project_id: str) -> Optional[str]:
+    """
+    Get the s3 key prefix of the project storage configuration
+    """
+    return get_cached_icav2_metadata(
+        ("project_prefix", project_id),
+        lambda: get_s3_key_prefix_by_project_id(project_id)
+    )
+
+
 class PreLaunchSomaticTags(TypedDict):
     """
     Launch tags we can expect when running the workflow in somatic mode
@@ -124,19 +418,23 @@ def validate_engine_parameters(
     if project_id is None:
         return False, f"projectId is not set"
     try:
-        get_project_obj_from_project_id(project_id)
+        get_project_obj(project_id)
     except ApiException:
         return False, f"Cannot find project id {project_id}"
 
     # Validate the uris are correct
+    # The project prefix may have come from the cache, so drop it on a mismatch
+    # such that a re-validation re-fetches the prefix
     if not output_uri.startswith(project_prefix):
+        invalidate_icav2_metadata(("project_prefix", project_id))
         return False, f"outputUri '{output_uri}' is not in the project context '{project_prefix}'"
     if not logs_uri.startswith(project_prefix):
+        invalidate_icav2_metadata(("project_prefix", project_id))
         return False, f"logsUri '{logs_uri}' is not in the project context '{project_prefix}'"
 
     # Confirm the pipeline is in the project
     try:
-        _ = get_project_pipeline_obj(
+        _ = get_pipeline_obj(
             project_id=project_id,
             pipeline_id=pipeline_id,
         )
@@ -144,7 +442,7 @@ def validate_engine_parameters(
         return False, f"The pipeline {pipeline_id} cannot be found in the project {project_id}"
 
     # Get the portal run id from the workflow run id
-    portal_run_id = get_workflow_run(workflow_run_id)['portalRunId']
+    portal_run_id = ORCABUS_API_MEMO(get_workflow_run, workflow_run_id)['portalRunId']
 
     # Confirm that the output uri, logs uri end with the portal run id
     if not output_uri.endswith(f"/{ANALYSIS_MIDFIX}/{WORKFLOW_NAME}/{portal_run_id}/"):
@@ -155,6 +453,258 @@ def validate_engine_parameters(
     return True, ""
 
 
+def get_first_failure(
+        check_func: Callable[[str], Optional[str]],
+        data_uris: List[str]
+) -> Optional[str]:
+    """
+    Run a check over each data uri concurrently and return the failure message of the first uri (in list order)
+    that fails, checks on uris after a known failure are cancelled.
+    An exception raised by a check is only re-raised if no earlier uri failed, as the sequential loop would have.
+    :param check_func: Returns None if the uri passes, otherwise the failure message
+    :param data_uris: The data uris to check
+    :return: The failure message, or None if every uri passes
+    """
+    # The failure message or the exception of each uri that did not pass
+    failures: Dict[int, Union[str, Exception]] = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_URI_CHECK_WORKERS) as executor:
+        future_to_idx = {
+            executor.submit(check_func, data_uri): idx
+            for idx, data_uri in enumerate(data_uris)
+        }
+
+        for future in as_completed(future_to_idx):
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                failures[future_to_idx[future]] = future.exception()
+            elif future.result() is not None:
+                failures[future_to_idx[future]] = future.result()
+            else:
+                continue
+            # Uris after this one can no longer be the first failure
+            for other_future, other_idx in future_to_idx.items():
+                if other_idx > future_to_idx[future]:
+                    other_future.cancel()
+
+    if len(failures) == 0:
+        return None
+
+    first_failure = failures[min(failures)]
+    if isinstance(first_failure, Exception):
+        raise first_failure
+
+    return first_failure
+
+
+def has_files_under_prefix(bucket: str, prefix: str) -> bool:
+    """
+    Confirm at least one (current) object exists under a prefix.
+    Only the first page of a single row is requested, rather than paging through the whole listing.
+    :param bucket: The bucket name
+    :param prefix: The key prefix
+    :return: True if any object exists under the prefix
+    """
+    response = get_file_manager_request(
+        S3_LIST_ENDPOINT,
+        params={
+            "bucket": bucket,
+            "key": f"{prefix}*",
+            "currentState": json.dumps(True),
+            "rowsPerPage": 1,
+        }
+    )
+    return len(response.get("results", [])) > 0
+
+
+def get_parent_prefix_from_s3_uri(s3_uri: str) -> Tuple[str, str]:
+    """
+    Get the bucket and the parent 'directory' key prefix of a file uri,
+    the prefix is empty for a file at the root of the bucket
+    """
+    s3_uri_obj = urlparse(s3_uri)
+    parent_key = str(Path(s3_uri_obj.path).parent).strip("/")
+    return s3_uri_obj.netloc, (parent_key + "/" if parent_key else "")
+
+
+def get_s3_object_ids_from_s3_uris(s3_uris: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Resolve many file uris to their filemanager s3 object ids.
+
+    Uris are grouped by bucket and parent prefix (i.e. all fastqs of a library from the same instrument run).
+    A prefix shared by more than one uri is resolved with a single page of the listing,
+    as long as the prefix does not hold more than MAX_LISTING_ROWS_PER_URI objects per uri in the group.
+    Larger prefixes (i.e. a big flat folder) and uris that are alone in their prefix fall back to point lookups.
+    :param s3_uris: The file uris
+    :return: uri -> s3 object id, None if the uri does not exist in the filemanager
+    """
+    def _get_s3_object_id(s3_uri: str) -> Optional[str]:
+        try:
+            return get_s3_object_id_from_s3_uri(s3_uri)
+        except S3FileNotFoundError:
+            return None
+
+    def _resolve_group(bucket_prefix: Tuple[str, str], group_uris: List[str]) -> Dict[str, Optional[str]]:
+        if len(group_uris) > 1:
+            rows_per_page = len(group_uris) * MAX_LISTING_ROWS_PER_URI
+            file_objs = get_file_manager_request(
+                S3_LIST_ENDPOINT,
+                params={
+                    "bucket": bucket_prefix[0],
+                    "key": f"{bucket_prefix[1]}*",
+                    "currentState": json.dumps(True),
+                    "rowsPerPage": rows_per_page,
+                }
+            ).get("results", [])
+
+            # A full page means the prefix holds more than the group, so the listing may be incomplete
+            if len(file_objs) < rows_per_page:
+                s3_object_id_by_uri = dict(map(
+                    lambda file_obj_iter_: (
+                        f"s3://{file_obj_iter_['bucket']}/{file_obj_iter_['key']}",
+                        file_obj_iter_['s3ObjectId']
+                    ),
+                    file_objs
+                ))
+                return dict(map(
+                    lambda uri_iter_: (uri_iter_, s3_object_id_by_uri.get(uri_iter_)),
+                    group_uris
+                ))
+
+        return dict(map(
+            lambda uri_iter_: (uri_iter_, _get_s3_object_id(uri_iter_)),
+            group_uris
+        ))
+
+    uri_groups = list(map(
+        lambda group_iter_: (group_iter_[0], list(group_iter_[1])),
+        groupby(sorted(set(s3_uris), key=get_parent_prefix_from_s3_uri), key=get_parent_prefix_from_s3_uri)
+    ))
+
+    s3_object_id_by_uri: Dict[str, Optional[str]] = {}
+    with ThreadPoolExecutor(max_workers=MAX_URI_CHECK_WORKERS) as executor:
+        for group_result in executor.map(lambda group_iter_: _resolve_group(*group_iter_), uri_groups):
+            s3_object_id_by_uri.update(group_result)
+
+    return s3_object_id_by_uri
+
+
+def check_data_uri_exists(
+        data_uri: str,
+        s3_object_id_by_uri: Dict[str, Optional[str]]
+) -> Optional[str]:
+    """
+    Confirm the file / folder uri exists in the filemanager
+    :param data_uri: The data uri
+    :param s3_object_id_by_uri: The pre-resolved s3 object ids of the file uris
+    :return: None if the uri exists, otherwise the failure message
+    """
+    # Check if it's a folder URI (ends with /)
+    if data_uri.endswith("/"):
+        # For folder URIs, verify at least 1 file exists under that prefix
+        if not has_files_under_prefix(
+                urlparse(data_uri).netloc,
+                (str(Path(urlparse(data_uri).path)).lstrip("/") + "/")
+        ):
+            return f"Folder URI '{data_uri}' has no files found under that prefix in the Filemanager"
+    else:
+        # For file URIs, confirm the file exists
+        if s3_object_id_by_uri.get(data_uri) is None:
+            return f"Data URI '{data_uri}' cannot be found by the Filemanager, are you sure it exists?"
+
+    return None
+
+
+def check_data_uri_in_project_context(data_uri: str, project_id: str) -> Optional[str]:
+    """
+    Confirm the data uri is accessible in the ICAv2 project context
+    :param data_uri: The data uri
+    :param project_id: The ICAv2 project id
+    :return: None if the uri is linked to the project, otherwise the failure message
+    """
+    # Try get the icav2 object by uri
+    try:
+        project_data_obj = coerce_data_id_or_uri_to_project_data_obj(
+            data_id_or_uri=data_uri,
+        )
+    except ValueError as e:
+        return f"Data URI '{data_uri}' cannot be found in the project context '{project_id}'"
+
+    # Then try get it in this context
+    try:
+        get_project_data_obj_by_id(
+            project_id=project_id,
+            data_id=project_data_obj.data.id
+        )
+    except ApiException as e:
+        return f"Data URI '{data_uri}' cannot be found in the project context '{project_id}'"
+
+    return None
+
+
+def get_project_linked_data_uris(data_uris: List[str], project_id: str) -> Set[str]:
+    """
+    Confirm in bulk which data uris are linked to the project.
+
+    Uris are grouped by parent folder (fastqs from the same instrument run share a folder).
+    For each folder shared by more than one uri, one uri is resolved to find the folder path and its owning project,
+    and the project data directly under that folder is listed once in the project context.
+    A sibling uri is only confirmed if the listing has an entry with the same owning project and full path
+    (and the same data id for the resolved uri), so a same-named file that merely exists in the project does not count.
+
+    Uris that cannot be confirmed this way are NOT returned, and so should be checked individually.
+    :param data_uris: The data uris to confirm
+    :param project_id: The ICAv2 project id
+    :return: The set of data uris confirmed to be linked to the project
+    """
+    def _confirm_group(group_uris: List[str]) -> Set[str]:
+        if len(group_uris) == 1:
+            return set()
+
+        try:
+            source_data_obj = coerce_data_id_or_uri_to_project_data_obj(
+                data_id_or_uri=group_uris[0],
+            )
+            owning_project_id = source_data_obj.data.details.owning_project_id
+            parent_folder_path = Path(source_data_obj.data.details.path).parent
+            linked_data_id_by_path = dict(map(
+                lambda project_data_iter_: (project_data_iter_.data.details.path, project_data_iter_.data.id),
+                filter(
+                    lambda project_data_iter_: project_data_iter_.data.details.owning_project_id == owning_project_id,
+                    list_project_data_non_recursively(
+                        project_id=project_id,
+                        parent_folder_path=parent_folder_path,
+                    )
+                )
+            ))
+        except (ValueError, ApiException):
+            return set()
+
+        linked_data_uris = set(filter(
+            lambda uri_iter_: str(parent_folder_path / Path(urlparse(uri_iter_).path).name) in linked_data_id_by_path,
+            group_uris
+        ))
+
+        # The resolved uri must be the very same data object
+        if linked_data_id_by_path.get(source_data_obj.data.details.path) != source_data_obj.data.id:
+            linked_data_uris.discard(group_uris[0])
+
+        return linked_data_uris
+
+    uri_groups = list(map(
+        lambda group_iter_: list(group_iter_[1]),
+        groupby(sorted(set(data_uris), key=get_parent_prefix_from_s3_uri), key=get_parent_prefix_from_s3_uri)
+    ))
+
+    linked_data_uris: Set[str] = set()
+    with ThreadPoolExecutor(max_workers=MAX_URI_CHECK_WORKERS) as executor:
+        for group_result in executor.map(_confirm_group, uri_groups):
+            linked_data_uris.update(group_result)
+
+    return linked_data_uris
+
+
 def validate_inputs(
         inputs: Dict,
         project_id: str,
@@ -202,26 +752,17 @@ def validate_inputs(
         lambda uri: not uri.startswith(f"s3://{REF_DATA_BUCKET}/"),
         data_uris
     ))
-    for data_uri in non_reference_data_uris:
-        # Check if it's a folder URI (ends with /)
-        if data_uri.endswith("/"):
-            # For folder URIs, verify at least 1 file exists under that prefix
-            if not (
-                    len(
-                        list_files_recursively(
-                            urlparse(data_uri).netloc,
-                            (str(Path(urlparse(data_uri).path)).lstrip("/") + "/")
-                        )
-                    ) > 0
-            ):
-                return False, f"Folder URI '{data_uri}' has no files found under that prefix in the Filemanager"
-        else:
-            # For file URIs, confirm the file exists
-            try:
-                get_s3_object_id_from_s3_uri(data_uri)
-            except S3FileNotFoundError:
-                return False, f"Data URI '{data_uri}' cannot be found by the Filemanager, are you sure it exists?"
-
+    # Resolve all file uris in bulk up front
+    s3_object_id_by_uri = get_s3_object_ids_from_s3_uris(list(filter(
+        lambda uri: not uri.endswith("/"),
+        non_reference_data_uris
+    )))
+    failure = get_first_failure(
+        lambda data_uri_iter_: check_data_uri_exists(data_uri_iter_, s3_object_id_by_uri),
+        non_reference_data_uris
+    )
+    if failure is not None:
+        return False, failure
 
     # Phase 2: ICA project context validation
     # Only URIs outside ref/test/project-prefix need ICA project linking confirmed
@@ -235,23 +776,18 @@ def validate_inputs(
     ))
 
     # Validate each URI is accessible in the project context
-    for data_uri in uris_to_validate:
-        # Try get the icav2 object by uri
-        try:
-            project_data_obj = coerce_data_id_or_uri_to_project_data_obj(
-                data_id_or_uri=data_uri,
-            )
-        except ValueError as e:
-            return False, f"Data URI '{data_uri}' cannot be found in the project context '{project_id}'"
-
-        # Then try get it in this context
-        try:
-            get_project_data_obj_by_id(
-                project_id=project_id,
-                data_id=project_data_obj.data.id
-            )
-        except ApiException as e:
-            return False, f"Data URI '{data_uri}' cannot be found in the project context '{project_id}'"
+    # Confirm what we can with one listing per folder, then check the remainder individually
+    linked_data_uris = get_project_linked_data_uris(uris_to_validate, project_id)
+    failure = get_first_failure(
+        lambda data_uri_iter_: (
+            check_data_uri_in_project_context(data_uri_iter_, project_id)
+            if data_uri_iter_ not in linked_data_uris
+            else None
+        ),
+        uris_to_validate
+    )
+    if failure is not None:
+        return False, failure
 
     return True, ""
 
@@ -314,6 +850,97 @@ def validate_clinical_input_metrics(
     return is_valid, comments
 
 
+def validate_clinical_inputs(
+        inputs: Dict[str, Any],
+        tags: PreLaunchSomaticTags,
+        workflow_run_id: str
+) -> Tuple[bool, Union[str, List[str]]]:
+    """
+    Check the input metrics of tumor normal runs.
+    Only automated clinical runs are invalidated on failure, otherwise the failures are returned as notes.
+    :param inputs: The workflow inputs
+    :param tags: The workflow tags
+    :param workflow_run_id: The workflow run ID
+    :return: A tuple of (is_valid, comment(s))
+    """
+    tumor_library_id = tags.get("tumorLibraryId", None)
+
+    # Germline only run
+    if tumor_library_id is None:
+        return True, ""
+
+    # Not a clinical sample
+    # Or not an automated run
+    if (
+            not ORCABUS_API_MEMO(get_library_from_library_id, tumor_library_id)['workflow'] == CLINICAL_WORKFLOW_NAME or
+            not ORCABUS_API_MEMO(get_workflow_run, workflow_run_id)["workflowRunName"].startswith(AUTOMATED_WORKFLOW_PREFIX)
+    ):
+        return validate_clinical_input_metrics(
+            inputs,
+            tags,
+            invalidate_on_failure=False
+        )
+
+    # Automated Clinical TN Sample
+    return validate_clinical_input_metrics(
+        inputs,
+        tags,
+        invalidate_on_failure=True
+    )
+
+
+def run_validation(
+        engine_parameters: Dict[str, Any],
+        inputs: Dict[str, Any],
+        tags: PreLaunchSomaticTags,
+        workflow_run_id: str,
+        project_prefix: str
+) -> Tuple[bool, Union[str, List[str]]]:
+    """
+    Run the engine parameter, input and clinical checks
+    :return: A tuple of (is_valid, comment(s)) of the first failing check, or of the clinical check if all pass
+    """
+    # The engine parameter, input and clinical checks are independent chains of lookups, so run them concurrently.
+    # Results are then read in a fixed order, the first invalid result wins,
+    # so the reported reason is the same as if the checks had run one after another
+    executor = ThreadPoolExecutor(max_workers=3)
+    try:
+        validation_futures = [
+            # Confirm the engine parameters match
+            executor.submit(
+                validate_engine_parameters,
+                engine_parameters,
+                workflow_run_id=workflow_run_id,
+                project_prefix=project_prefix,
+            ),
+            # Validate the inputs
+            executor.submit(
+                validate_inputs,
+                inputs,
+                project_id=engine_parameters.get("projectId"),
+                project_prefix=project_prefix
+            ),
+            # Check if this is a clinical sample and if we
+            # Need to hold off until coverage matches
+            executor.submit(
+                validate_clinical_inputs,
+                inputs,
+                tags,
+                workflow_run_id=workflow_run_id
+            ),
+        ]
+
+        for validation_future in validation_futures:
+            is_valid, comment = validation_future.result()
+            if not is_valid:
+                break
+    finally:
+        # Once the first invalid result in order is known, the checks after it are not waited on
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return is_valid, comment
+
+
 def handler(event, context) -> Dict[str, bool]:
     """
     Given a draft schema, validate it against the current schema and print the results.
@@ -323,6 +950,10 @@ def handler(event, context) -> Dict[str, bool]:
     # Set env vars
     set_icav2_env_vars()
 
+    # Fresh memo for this invocation
+    global ORCABUS_API_MEMO
+    ORCABUS_API_MEMO = OrcabusApiMemo()
+
     # Get the event data
     payload_data = event.get('data')
     workflow_run_id = event.get("workflowRunId", "")
@@ -332,88 +963,47 @@ def handler(event, context) -> Dict[str, bool]:
     engine_parameters = payload_data.get("engineParameters", {})
     tags = payload_data.get("tags", {})
 
-    # Get the project prefix
-    project_prefix = cast(str, get_s3_key_prefix_by_project_id(engine_parameters.get("projectId")))
-
-    # Confirm the engine parameters match
-    is_valid, comment = validate_engine_parameters(
-        engine_parameters,
-        workflow_run_id=workflow_run_id,
-        project_prefix=project_prefix,
-    )
-
     # Get the inputs and confirm that the fastq uris are valid
     # and are accessible in the right project context
     inputs = payload_data.get("inputs")
 
-    # Check if the inputs are also valid
-    if is_valid:
-        # Validate the inputs
-        is_valid, comment = validate_inputs(
+    # Unchanged inputs that validated successfully in the last few minutes do not need to be re-validated
+    validation_cache_key = get_validation_cache_key(workflow_run_id, engine_parameters, inputs, tags)
+    cache_entry = VALIDATION_RESULT_STORE.get(validation_cache_key)
+
+    if cache_entry is not None:
+        logger.info("Inputs are unchanged since they were last validated, reusing the validation result")
+        is_valid, comment = cache_entry['isValid'], cache_entry['comment']
+    else:
+        is_valid, comment = run_validation(
+            engine_parameters,
             inputs,
-            project_id=engine_parameters.get("projectId"),
-            # Get the key prefix for the project
-            project_prefix=cast(str, get_s3_key_prefix_by_project_id(engine_parameters.get("projectId")))
+            tags,
+            workflow_run_id=workflow_run_id,
+            project_prefix=cast(str, get_project_prefix(engine_parameters.get("projectId")))
         )
-
-    # Check if this is a clinical sample and if we
-    # Need to hold off until coverage matches
-    if is_valid:
-        tumor_library_id = tags.get("tumorLibraryId", None)
-        # Germline only run
-        if tumor_library_id is None:
-            pass
-        # Not a clinical sample
-        # Or not an automated run
-        elif (
-                not get_library_from_library_id(tumor_library_id)['workflow'] == CLINICAL_WORKFLOW_NAME or
-                not get_workflow_run(workflow_run_id)["workflowRunName"].startswith(AUTOMATED_WORKFLOW_PREFIX)
-        ):
-            is_valid, comment = validate_clinical_input_metrics(
-                inputs,
-                tags,
-                invalidate_on_failure=False
-            )
-        # Automated Clinical TN Sample
-        else:
-            is_valid, comment = validate_clinical_input_metrics(
-                inputs,
-                tags,
-                invalidate_on_failure=True
+        # Failures are not cached, they may be resolved without the inputs changing (i.e. data is uploaded)
+        if is_valid:
+            VALIDATION_RESULT_STORE.put(
+                validation_cache_key,
+                {"isValid": is_valid, "comment": comment}
             )
 
+    # Collect the comments for this invocation, these are posted together at the end
+    comment_outbox = CommentOutbox(workflow_run_id, execution_arn)
+
     # Somewhere along the way, the validation failed
     if not is_valid:
         if isinstance(comment, list) and len(comment) == 1:
             comment = comment[0]
         if isinstance(comment, list):
-            add_comment_to_workflow_run(
-                workflow_run_orcabus_id=workflow_run_id,
-                comment=_format_comment_with_arn(
-                    f"Post schema validation failed for {len(comment)} reasons",
-                    execution_arn
-                ),
-                author=COMMENT_AUTHOR
-            )
+            comment_outbox.add(f"Post schema validation failed for {len(comment)} reasons")
             for idx, comment_iter in enumerate(comment, start=1):
-                add_comment_to_workflow_run(
-                    workflow_run_orcabus_id=workflow_run_id,
-                    comment=_format_comment_with_arn(
-                        f"Reason {idx} of {len(comment)}: {comment_iter}",
-                        execution_arn
-                    ),
-                    author=COMMENT_AUTHOR
-                )
-                sleep(1)
+                comment_outbox.add(f"Reason {idx} of {len(comment)}: {comment_iter}")
         else:
-            add_comment_to_workflow_run(
-                workflow_run_orcabus_id=workflow_run_id,
-                comment=_format_comment_with_arn(
-                    f"Post schema validation failed: {comment}",
-                    execution_arn
-                ),
-                author=COMMENT_AUTHOR
-            )
+            comment_outbox.add(f"Post schema validation failed: {comment}")
+        comment_outbox.flush()
+        logger.info(f"OrcaBus API reads: {json.dumps(ORCABUS_API_MEMO.get_stats())}")
         return {
             "isValid": False
         }
@@ -422,24 +1012,9 @@ def handler(event, context) -> Dict[str, bool]:
     ):
         if isinstance(comment, list):
             for idx, comment_iter in enumerate(comment, start=1):
-                add_comment_to_workflow_run(
-                    workflow_run_orcabus_id=workflow_run_id,
-                    comment=_format_comment_with_arn(
-                        f"Post schema validation note {idx} of {len(comment)}: {comment_iter}",
-                        execution_arn
-                    ),
-                    author=COMMENT_AUTHOR
-                )
-                sleep(1)
+                comment_outbox.add(f"Post schema validation note {idx} of {len(comment)}: {comment_iter}")
         else:
-            add_comment_to_workflow_run(
-                workflow_run_orcabus_id=workflow_run_id,
-                comment=_format_comment_with_arn(
-                    f"Post schema validation note: {comment}",
-                    execution_arn
-                ),
-                author=COMMENT_AUTHOR
-            )
+            comment_outbox.add(f"Post schema validation note: {comment}")
 
     # Ensure that we comment if downsampling has been added
     if payload_data.get("inputs", {}).get("somaticAlignmentOptions", {}).get("enableFractionalDownSampler"):
@@ -454,12 +1029,11 @@ def handler(event, context) -> Dict[str, bool]:
             comment += ' - normal has been downsampled to {}'.format(
                 payload_data.get("inputs", {}).get("somaticAlignmentOptions", {}).get("downSamplerNormalSubsample")
             )
-        add_comment_to_workflow_run(
-            workflow_run_orcabus_id=workflow_run_id,
-            comment=_format_comment_with_arn(comment, execution_arn),
-            author=COMMENT_AUTHOR
-        )
+        comment_outbox.add(comment)
+
+    comment_outbox.flush()
 
+    logger.info(f"OrcaBus API reads: {json.dumps(ORCABUS_API_MEMO.get_stats())}")
     return {
         "isValid": True
     }
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+"""
+GENERATED by scripts/generate_schema_validators.py, do not edit
+
+Generated validators by payload version, as (schema sha256, get_missing_fields)
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import complete_data_draft_2025_06_04
+
+GENERATED_VALIDATORS_BY_PAYLOAD_VERSION: Dict[str, Tuple[str, Callable[[Any], List[str]]]] = {
+    "2025.06.04": (complete_data_draft_2025_06_04.SCHEMA_SHA256, complete_data_draft_2025_06_04.get_missing_fields),
+}
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+
+"""
+GENERATED by scripts/generate_schema_validators.py from
+app/event-schemas/complete-data-draft/2025.06.04/schema.json, do not edit
+"""
+
+# Standard imports
+import re
+from typing import Any, Callable, List, Tuple
+
+SCHEMA_SHA256 = "b4aff448e89f8f7162a2b515d1fbaceec88859c1ab2d7a6cef52bb0567b2fff7"
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _add_error(path: str, message: str, missing_fields: List[str]):
+    missing_fields.append(f"{path or '(root)'} ({message[:50]})")
+
+
+def _is_valid(validate_func: Callable, instance: Any) -> bool:
+    errors = []
+    validate_func(instance, "", errors)
+    return len(errors) == 0
+
+
+def _one_of(
+        instance: Any,
+        path: str,
+        missing_fields: List[str],
+        validate_funcs: Tuple[Callable, ...],
+        schema_reprs: Tuple[str, ...]
+):
+    valid_idxs = [
+        idx
+        for idx, validate_func in enumerate(validate_funcs)
+        if _is_valid(validate_func, instance)
+    ]
+    if len(valid_idxs) == 0:
+        _add_error(path, f"{instance!r} is not valid under any of the given schemas", missing_fields)
+    elif len(valid_idxs) > 1:
+        # Same order as jsonschema, the other valid schemas then the first valid schema
+        reprs = ", ".join(schema_reprs[idx] for idx in valid_idxs[1:] + valid_idxs[:1])
+        _add_error(path, f"{instance!r} is valid under each of {reprs}", missing_fields)
+
+
+_PATTERN_10 = re.compile('^s3://[a-zA-Z0-9_-]+/[a-zA-Z0-9_/-]*')
+_ENUM_13 = ['linear', 'graph']
+_PATTERN_19 = re.compile('^s3://[a-zA-Z0-9_-]+/[a-zA-Z0-9_/-]*/$')
+_PATTERN_22 = re.compile('.*/analysis/.*')
+_PATTERN_24 = re.compile('.*/output/.*')
+_ONE_OF_REPRS_25 = ("{'type': 'string', 'pattern': '.*/analysis/.*'}", "{'type': 'string', 'pattern': '.*/output/.*'}")
+_PATTERN_28 = re.compile('.*/logs/.*')
+
+
+def _validate_node_3(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+
+
+def _validate_node_4(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+
+
+def _validate_node_8(instance: Any, path: str, missing_fields: List[str]):
+    if not (((isinstance(instance, int) and not isinstance(instance, bool)) or (isinstance(instance, float) and instance.is_integer()))):
+        _add_error(path, f"{instance!r} is not of type 'integer'", missing_fields)
+
+
+def _validate_s3Uri_9(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if isinstance(instance, str) and not _PATTERN_10.search(instance):
+        _add_error(path, f"{instance!r} does not match {_PATTERN_10.pattern!r}", missing_fields)
+
+
+def _validate_fastqListRow_7(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'rgid' in instance:
+            _validate_node_3(instance['rgid'], _join(path, 'rgid'), missing_fields)
+        if 'rglb' in instance:
+            _validate_node_3(instance['rglb'], _join(path, 'rglb'), missing_fields)
+        if 'rgsm' in instance:
+            _validate_node_3(instance['rgsm'], _join(path, 'rgsm'), missing_fields)
+        if 'lane' in instance:
+            _validate_node_8(instance['lane'], _join(path, 'lane'), missing_fields)
+        if 'rgcn' in instance:
+            _validate_node_3(instance['rgcn'], _join(path, 'rgcn'), missing_fields)
+        if 'rgds' in instance:
+            _validate_node_3(instance['rgds'], _join(path, 'rgds'), missing_fields)
+        if 'rgdt' in instance:
+            _validate_node_3(instance['rgdt'], _join(path, 'rgdt'), missing_fields)
+        if 'rgpl' in instance:
+            _validate_node_3(instance['rgpl'], _join(path, 'rgpl'), missing_fields)
+        if 'read1FileUri' in instance:
+            _validate_s3Uri_9(instance['read1FileUri'], _join(path, 'read1FileUri'), missing_fields)
+        if 'read2FileUri' in instance:
+            _validate_s3Uri_9(instance['read2FileUri'], _join(path, 'read2FileUri'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['rgid', 'rgsm', 'read1FileUri'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_node_6(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, list)):
+        _add_error(path, f"{instance!r} is not of type 'array'", missing_fields)
+    if isinstance(instance, list):
+        for _idx, _item in enumerate(instance):
+            _validate_fastqListRow_7(_item, _join(path, _idx), missing_fields)
+
+
+def _validate_sequenceData_5(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'fastqListRows' in instance:
+            _validate_node_6(instance['fastqListRows'], _join(path, 'fastqListRows'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['fastqListRows'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_structure_12(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if instance not in _ENUM_13:
+        _add_error(path, f"{instance!r} is not one of {_ENUM_13!r}", missing_fields)
+
+
+def _validate_reference_11(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'name' in instance:
+            _validate_node_3(instance['name'], _join(path, 'name'), missing_fields)
+        if 'structure' in instance:
+            _validate_structure_12(instance['structure'], _join(path, 'structure'), missing_fields)
+        if 'tarball' in instance:
+            _validate_s3Uri_9(instance['tarball'], _join(path, 'tarball'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['name', 'structure', 'tarball'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_inputs_2(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'sampleName' in instance:
+            _validate_node_3(instance['sampleName'], _join(path, 'sampleName'), missing_fields)
+        if 'tumorSampleName' in instance:
+            _validate_node_3(instance['tumorSampleName'], _join(path, 'tumorSampleName'), missing_fields)
+        if 'alignmentOptions' in instance:
+            _validate_node_4(instance['alignmentOptions'], _join(path, 'alignmentOptions'), missing_fields)
+        if 'targetedCallerOptions' in instance:
+            _validate_node_4(instance['targetedCallerOptions'], _join(path, 'targetedCallerOptions'), missing_fields)
+        if 'snvVariantCallerOptions' in instance:
+            _validate_node_4(instance['snvVariantCallerOptions'], _join(path, 'snvVariantCallerOptions'), missing_fields)
+        if 'sequenceData' in instance:
+            _validate_sequenceData_5(instance['sequenceData'], _join(path, 'sequenceData'), missing_fields)
+        if 'tumorSequenceData' in instance:
+            _validate_sequenceData_5(instance['tumorSequenceData'], _join(path, 'tumorSequenceData'), missing_fields)
+        if 'reference' in instance:
+            _validate_reference_11(instance['reference'], _join(path, 'reference'), missing_fields)
+        if 'somaticReference' in instance:
+            _validate_reference_11(instance['somaticReference'], _join(path, 'somaticReference'), missing_fields)
+        if 'oraReference' in instance:
+            _validate_s3Uri_9(instance['oraReference'], _join(path, 'oraReference'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['sampleName', 'sequenceData', 'reference'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_node_15(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, list)):
+        _add_error(path, f"{instance!r} is not of type 'array'", missing_fields)
+    if isinstance(instance, list):
+        for _idx, _item in enumerate(instance):
+            _validate_node_3(_item, _join(path, _idx), missing_fields)
+
+
+def _validate_tags_14(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'libraryId' in instance:
+            _validate_node_3(instance['libraryId'], _join(path, 'libraryId'), missing_fields)
+        if 'tumorLibraryId' in instance:
+            _validate_node_3(instance['tumorLibraryId'], _join(path, 'tumorLibraryId'), missing_fields)
+        if 'fastqRgidList' in instance:
+            _validate_node_15(instance['fastqRgidList'], _join(path, 'fastqRgidList'), missing_fields)
+        if 'tumorFastqRgidList' in instance:
+            _validate_node_15(instance['tumorFastqRgidList'], _join(path, 'tumorFastqRgidList'), missing_fields)
+        if 'subjectId' in instance:
+            _validate_node_3(instance['subjectId'], _join(path, 'subjectId'), missing_fields)
+        if 'individualId' in instance:
+            _validate_node_3(instance['individualId'], _join(path, 'individualId'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['libraryId'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_s3UriDirectory_18(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if isinstance(instance, str) and not _PATTERN_19.search(instance):
+        _add_error(path, f"{instance!r} does not match {_PATTERN_19.pattern!r}", missing_fields)
+
+
+def _validate_node_21(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if isinstance(instance, str) and not _PATTERN_22.search(instance):
+        _add_error(path, f"{instance!r} does not match {_PATTERN_22.pattern!r}", missing_fields)
+
+
+def _validate_node_23(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if isinstance(instance, str) and not _PATTERN_24.search(instance):
+        _add_error(path, f"{instance!r} does not match {_PATTERN_24.pattern!r}", missing_fields)
+
+
+def _validate_node_20(instance: Any, path: str, missing_fields: List[str]):
+    _one_of(instance, path, missing_fields, (_validate_node_21, _validate_node_23,), _ONE_OF_REPRS_25)
+
+
+def _validate_outputUri_17(instance: Any, path: str, missing_fields: List[str]):
+    _validate_s3UriDirectory_18(instance, path, missing_fields)
+    _validate_node_20(instance, path, missing_fields)
+
+
+def _validate_node_27(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, str)):
+        _add_error(path, f"{instance!r} is not of type 'string'", missing_fields)
+    if isinstance(instance, str) and not _PATTERN_28.search(instance):
+        _add_error(path, f"{instance!r} does not match {_PATTERN_28.pattern!r}", missing_fields)
+
+
+def _validate_logsUri_26(instance: Any, path: str, missing_fields: List[str]):
+    _validate_s3UriDirectory_18(instance, path, missing_fields)
+    _validate_node_27(instance, path, missing_fields)
+
+
+def _validate_engineParameters_16(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'projectId' in instance:
+            _validate_node_3(instance['projectId'], _join(path, 'projectId'), missing_fields)
+        if 'pipelineId' in instance:
+            _validate_node_3(instance['pipelineId'], _join(path, 'pipelineId'), missing_fields)
+        if 'outputUri' in instance:
+            _validate_outputUri_17(instance['outputUri'], _join(path, 'outputUri'), missing_fields)
+        if 'logsUri' in instance:
+            _validate_logsUri_26(instance['logsUri'], _join(path, 'logsUri'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['projectId', 'pipelineId', 'outputUri', 'logsUri'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def _validate_node_1(instance: Any, path: str, missing_fields: List[str]):
+    if not (isinstance(instance, dict)):
+        _add_error(path, f"{instance!r} is not of type 'object'", missing_fields)
+    if isinstance(instance, dict):
+        if 'inputs' in instance:
+            _validate_inputs_2(instance['inputs'], _join(path, 'inputs'), missing_fields)
+        if 'tags' in instance:
+            _validate_tags_14(instance['tags'], _join(path, 'tags'), missing_fields)
+        if 'engineParameters' in instance:
+            _validate_engineParameters_16(instance['engineParameters'], _join(path, 'engineParameters'), missing_fields)
+    if isinstance(instance, dict):
+        _missing_properties = [_prop for _prop in ['inputs', 'tags', 'engineParameters'] if _prop not in instance]
+        for _ in _missing_properties:
+            missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)
+
+
+def get_missing_fields(instance: Any) -> List[str]:
+    """
+    Get the missing / invalid field paths of the instance, an empty list if the instance is valid
+    """
+    missing_fields = []
+    _validate_node_1(instance, "", missing_fields)
+    return missing_fields
@@ -3,6 +3,12 @@
 """
 Download the draft schema, validate it against the current schema, and print the results.
 
+Returns whether the draft is valid, every missing / invalid field and the first (most relevant) error
+from a single validation pass.
+
+When given a portal run id, the results of each subtree of the draft (i.e. inputs.sequenceData, tags.libraryId)
+are kept for the portal run, and only the subtrees that changed since the last validation of that run are revalidated.
+
 Confirm the following:
 - Each fastq uri is a valid s3 uri AND is accessible in the project id context for a given ICAv2 project id
 
@@ -10,15 +16,22 @@ Confirm the following:
 
 # Imports
 import boto3
+import hashlib
 import typing
-import jsonschema
-from typing import Dict
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, TypedDict
 import logging
-from jsonschema import ValidationError
+from jsonschema.exceptions import ValidationError, best_match, relevance
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 from os import environ
 import json
 from pathlib import Path
 
+# Local imports
+from generated_validators import GENERATED_VALIDATORS_BY_PAYLOAD_VERSION
+
 # Layer imports
 from orcabus_api_tools.workflow import add_comment_to_workflow_run
 
@@ -32,12 +45,109 @@ SSM_REGISTRY_NAME_ENV_VAR = "SSM_REGISTRY_NAME"
 SSM_SCHEMA_PATH_ENV_VAR = "SSM_SCHEMA_PATH"
 WORKFLOW_NAME_ENV_VAR = "WORKFLOW_NAME"
 DEFAULT_PAYLOAD_VERSION_ENV_VAR = "DEFAULT_PAYLOAD_VERSION"
+BUNDLED_SCHEMAS_INDEX_ENV_VAR = "BUNDLED_SCHEMAS_INDEX"
 COMMENT_AUTHOR = "{WORKFLOW_NAME}-workflow-validation-service"
+# Compiled schema validators are kept across warm invocations, keyed by payload version
+SCHEMA_VALIDATOR_CACHE_TTL_SECONDS = 300
+SCHEMA_VALIDATOR_CACHE: Dict[str, Tuple[float, 'SchemaValidators']] = {}
+# Per portal run subtree validation results, drafts of a run are split into subtrees down to this depth
+SUBTREE_VALIDATION_STORE_TTL_SECONDS = 3600
+MAX_SUBTREE_DEPTH = 2
+# Schema nodes using any of these keywords alongside 'properties' are validated as a whole
+NON_SPLITTABLE_KEYWORDS = {
+    "$ref", "$dynamicRef", "allOf", "anyOf", "oneOf", "not", "if", "then", "else",
+    "additionalProperties", "patternProperties", "unevaluatedProperties", "dependentSchemas", "propertyNames",
+}
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+class DraftValidationResult(TypedDict):
+    isValid: bool
+    missingFields: List[str]
+    firstError: Optional[str]
+
+
+class ValidationStep(TypedDict):
+    """
+    A step of the validation of a draft, in the order jsonschema would validate the draft.
+    'shell' steps validate the keywords of a split node other than its properties, and are always run,
+    'subtree' steps validate the value at path against the whole schema, and are reused while the value is unchanged,
+    'property' steps descend into the property at path, only if it is present.
+    """
+    kind: str
+    path: List[str]
+    schema: Optional[Dict[str, Any]]
+    steps: Optional[List['ValidationStep']]
+
+
+class StepResult(TypedDict):
+    missingFields: List[str]
+    # The relevance and formatted best match of the step's most relevant error
+    bestErrorRelevance: Optional[List[Any]]
+    firstError: Optional[str]
+
+
+class SchemaValidators(TypedDict):
+    validator: Validator
+    # Generated by scripts/generate_schema_validators.py, None if the schema has no up-to-date generated validator
+    getMissingFields: Optional[Callable[[Any], List[str]]]
+    schemaSha256: str
+    validationSteps: List[ValidationStep]
+
+
+@lru_cache(maxsize=None)
+class SubtreeValidationStore(Protocol):
+    """
+    Where the subtree validation results of each portal run are kept.
+    Assign a shared implementation (such as a DynamoDB table) to SUBTREE_VALIDATION_STORE
+    to keep the results beyond a single Lambda container.
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def put(self, key: str, value: Dict[str, Any]): ...
+
+
+class InMemorySubtreeValidationStore:
+    """
+    Keep the subtree validation results in the warm Lambda container until they are older than the ttl,
+    expired entries are dropped on each put
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or monotonic() - entry[0] >= self.ttl_seconds:
+            return None
+        return entry[1]
+
+    def put(self, key: str, value: Dict[str, Any]):
+        now = monotonic()
+        for expired_key in list(filter(
+            lambda key_iter_: now - self.entries[key_iter_][0] >= self.ttl_seconds,
+            self.entries
+        )):
+            del self.entries[expired_key]
+        self.entries[key] = (now, value)
+
+
+SUBTREE_VALIDATION_STORE: SubtreeValidationStore = InMemorySubtreeValidationStore(SUBTREE_VALIDATION_STORE_TTL_SECONDS)
+
+
+def get_ssm_client() -> 'SSMClient':
+    return boto3.client("ssm")
+
+
+@lru_cache(maxsize=None)
+def get_schemas_client() -> 'SchemasClient':
+    return boto3.client("schemas")
+
+
 def get_ssm_parameter_value(parameter_name: str) -> str:
     """
     Get the SSM parameter for the schema.
@@ -45,7 +155,7 @@ def get_ssm_parameter_value(parameter_name: str) -> str:
     """
 
     # Get the ssm client
-    ssm_client: SSMClient = boto3.client("ssm")
+    ssm_client = get_ssm_client()
 
     # Get the SSM parameter value
     response = ssm_client.get_parameter(
@@ -68,7 +178,7 @@ def get_schema_from_registry(
     """
 
     # Get the schemas client
-    schemas_client: SchemasClient = boto3.client("schemas")
+    schemas_client = get_schemas_client()
 
     # Get the schema from the registry
     response = schemas_client.describe_schema(
@@ -79,72 +189,423 @@ def get_schema_from_registry(
     return response["Content"]
 
 
-def validate_draft_schema(
-        json_schema: str,
-        json_body: str,
-        workflow_run_id: str,
-        comment_error: bool = False
-) -> bool:
+def get_bundled_schema(payload_version: str) -> Optional[Dict[str, Any]]:
     """
-    Download the draft schema, validate it against the current schema, and print the results.
-
-    :param json_schema: The current schema as a JSON string.
-    :param json_body: The draft schema as a JSON string.
-    :param workflow_run_id: The workflow run ID to add comments to (if any).
-    :param comment_error: Whether to add a comment to the workflow run on validation error.
+    Get the schema shipped with the lambda (through the event schemas layer) for a payload version.
+    :param payload_version: The payload version
+    :return: The schema, or None if the version is not bundled or the bundled file does not match its checksum
     """
+    bundled_schemas_index = json.loads(environ.get(BUNDLED_SCHEMAS_INDEX_ENV_VAR, "{}"))
+    if payload_version not in bundled_schemas_index:
+        return None
+
     try:
-        jsonschema.validate(
-            instance=json.loads(json_body),
-            schema=json.loads(json_schema),
+        schema_bytes = Path(bundled_schemas_index[payload_version]['path']).read_bytes()
+    except FileNotFoundError:
+        logger.warning(f"Bundled schema for payload version {payload_version} is missing, using the schema registry")
+        return None
+
+    if hashlib.sha256(schema_bytes).hexdigest() != bundled_schemas_index[payload_version]['sha256']:
+        logger.warning(f"Bundled schema for payload version {payload_version} failed its checksum, using the schema registry")
+        return None
+
+    return json.loads(schema_bytes)
+
+
+def get_schema_checksum(schema: Dict[str, Any]) -> str:
+    """
+    Checksum of the schema independent of its formatting,
+    must match scripts/generate_schema_validators.get_schema_checksum
+    """
+    return hashlib.sha256(json.dumps(schema).encode()).hexdigest()
+
+
+def get_generated_validator(
+        payload_version: str,
+        schema: Dict[str, Any]
+) -> Optional[Callable[[Any], List[str]]]:
+    """
+    Get the generated validator for a payload version, only if it was generated from this exact schema
+    :param payload_version: The payload version
+    :param schema: The current schema
+    :return: The generated get_missing_fields function, or None
+    """
+    if payload_version not in GENERATED_VALIDATORS_BY_PAYLOAD_VERSION:
+        return None
+
+    schema_sha256, get_missing_fields = GENERATED_VALIDATORS_BY_PAYLOAD_VERSION[payload_version]
+    if schema_sha256 != get_schema_checksum(schema):
+        logger.warning(f"Generated validator for payload version {payload_version} is out of date, not using it")
+        return None
+
+    return get_missing_fields
+
+
+def get_validation_steps(
+        root_schema: Dict[str, Any],
+        node_schema: Any,
+        path: List[str],
+        depth: int
+) -> List[ValidationStep]:
+    """
+    Split the validation of a schema node into steps, in the order jsonschema validates the node's keywords.
+    Object nodes are split into their properties down to MAX_SUBTREE_DEPTH, every other node is a single subtree.
+    :param root_schema: The current schema, to resolve local refs
+    :param node_schema: The schema of the node
+    :param path: The path of the node in the draft
+    :param depth: The depth of the node in the draft
+    :return: The validation steps
+    """
+    # Follow nodes that are only a local ref, i.e. {"$ref": "#/$defs/inputs"}
+    while (
+        isinstance(node_schema, dict) and list(node_schema.keys()) == ["$ref"] and
+        node_schema["$ref"].startswith("#/")
+    ):
+        ref_node = root_schema
+        for ref_part in node_schema["$ref"][2:].split("/"):
+            ref_node = ref_node[ref_part]
+        node_schema = ref_node
+
+    if (
+        depth >= MAX_SUBTREE_DEPTH or
+        not isinstance(node_schema, dict) or
+        "properties" not in node_schema or
+        len(NON_SPLITTABLE_KEYWORDS.intersection(node_schema.keys())) > 0
+    ):
+        return [{"kind": "subtree", "path": path, "schema": node_schema, "steps": None}]
+
+    validation_steps: List[ValidationStep] = []
+    for keyword, value in node_schema.items():
+        if keyword == "properties":
+            validation_steps.extend(map(
+                lambda property_iter_: {
+                    "kind": "property",
+                    "path": path + [property_iter_[0]],
+                    "schema": None,
+                    "steps": get_validation_steps(root_schema, property_iter_[1], path + [property_iter_[0]], depth + 1),
+                },
+                value.items()
+            ))
+        elif len(validation_steps) > 0 and validation_steps[-1]['kind'] == "shell":
+            # Consecutive keywords are validated in the one shell step
+            validation_steps[-1]['schema'][keyword] = value
+        else:
+            validation_steps.append({"kind": "shell", "path": path, "schema": {keyword: value}, "steps": None})
+
+    return validation_steps
+
+
+def get_schema_validator(payload_version: str) -> SchemaValidators:
+    """
+    Get the compiled validator (and the generated validator if available) for the current schema of a payload version.
+    The schema is only re-fetched from the registry once the cached validator is older than the ttl.
+    :param payload_version: The payload version
+    :return: The schema validators
+    """
+    cache_entry = SCHEMA_VALIDATOR_CACHE.get(payload_version)
+    if cache_entry is not None and monotonic() - cache_entry[0] < SCHEMA_VALIDATOR_CACHE_TTL_SECONDS:
+        return cache_entry[1]
+
+    # Use the bundled schema where we can
+    current_schema = get_bundled_schema(payload_version)
+
+    if current_schema is None:
+        # Get the SSM parameters
+        schema_registry = get_ssm_parameter_value(environ[SSM_REGISTRY_NAME_ENV_VAR])
+        schema_name = json.loads(get_ssm_parameter_value(
+            str(Path(environ[SSM_SCHEMA_PATH_ENV_VAR]) / payload_version)
+        ))['schemaName']
+
+        # Get the current schema from the schema registry
+        current_schema = json.loads(get_schema_from_registry(
+            registry_name=schema_registry,
+            schema_name=schema_name
+        ))
+
+    # Compile the validator, as jsonschema.validate would
+    validator_cls = validator_for(current_schema)
+    validator_cls.check_schema(current_schema)
+    schema_validators: SchemaValidators = {
+        "validator": validator_cls(current_schema),
+        "getMissingFields": get_generated_validator(payload_version, current_schema),
+        "schemaSha256": get_schema_checksum(current_schema),
+        "validationSteps": get_validation_steps(current_schema, current_schema, [], 0),
+    }
+
+    SCHEMA_VALIDATOR_CACHE[payload_version] = (monotonic(), schema_validators)
+
+    return schema_validators
+
+
+def get_missing_fields_from_errors(errors: List[ValidationError]) -> List[str]:
+    """
+    Convert validation errors into the list of missing / invalid field paths
+    :param errors: The validation errors
+    :return: i.e. ["inputs.sequenceData", "inputs.reference.tarball", "engineParameters.outputUri (...)"]
+    """
+    missing_fields = []
+    for error in errors:
+        # Get path of missing field
+        path = (
+            ".".join(list(map(
+                str,
+                error.absolute_path
+            )))
+            if error.absolute_path
+            else ""
         )
-    except ValidationError as e:
-        logger.info(f"Failed validation, {e}")
-        if comment_error:
-            add_comment_to_workflow_run(
-                workflow_run_orcabus_id=workflow_run_id,
-                comment=f"Draft schema validation failed: {e.message} at \"{e.json_path}\"",
-                author=COMMENT_AUTHOR.format(
-                    WORKFLOW_NAME=environ.get(WORKFLOW_NAME_ENV_VAR)
+        if error.validator == "required":
+            # For required errors, list each missing property
+            for missing_prop in error.validator_value:
+                if missing_prop not in error.instance:
+                    field_path = f"{path}.{missing_prop}" if path else missing_prop
+                    missing_fields.append(field_path)
+        else:
+            # For other errors (type, pattern, etc.)
+            missing_fields.append(f"{path or '(root)'} ({error.message[:50]})")
+
+    return missing_fields
+
+
+def validate_draft(
+        schema_validators: SchemaValidators,
+        instance: Any
+) -> DraftValidationResult:
+    """
+    Validate the draft against the current schema in a single pass,
+    collecting every error for the missing fields and picking the most relevant as the first error
+    (the same error jsonschema.validate would raise).
+
+    Valid drafts are confirmed by the generated validator alone,
+    the compiled validator is only run to describe the errors of an invalid draft.
+
+    :param schema_validators: The validators of the current schema.
+    :param instance: The draft data.
+    """
+    if (
+        schema_validators['getMissingFields'] is not None and
+        len(schema_validators['getMissingFields'](instance)) == 0
+    ):
+        return {
+            "isValid": True,
+            "missingFields": [],
+            "firstError": None,
+        }
+
+    errors = list(schema_validators['validator'].iter_errors(instance))
+    first_error = best_match(errors)
+
+    return {
+        "isValid": first_error is None,
+        "missingFields": get_missing_fields_from_errors(errors),
+        "firstError": (
+            f"{first_error.message} at \"{first_error.json_path}\""
+            if first_error is not None
+            else None
+        ),
+    }
+
+
+def get_subtree_digest(subtree: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(subtree, sort_keys=True, separators=(",", ":"), default=str).encode()
+    ).hexdigest()
+
+
+def get_step_result(
+        validator: Validator,
+        step_schema: Any,
+        instance: Any,
+        path: List[str]
+) -> StepResult:
+    """
+    Validate the value at path against the schema of a validation step
+    :param validator: The compiled validator of the current schema (refs are resolved against the whole schema)
+    :param step_schema: The schema of the step
+    :param instance: The value at path
+    :param path: The path of the value in the draft
+    """
+    errors = list(validator.evolve(schema=step_schema).iter_errors(instance))
+    for error in errors:
+        # Make the error paths relative to the draft, as if the whole draft was validated
+        error.path.extendleft(reversed(path))
+
+    if len(errors) == 0:
+        return {"missingFields": [], "bestErrorRelevance": None, "firstError": None}
+
+    # best_match is the max relevance error (the first in case of a tie), then descends into its context
+    most_relevant_error = max(errors, key=relevance)
+    first_error = best_match([most_relevant_error])
+    error_relevance = relevance(most_relevant_error)
+
+    return {
+        "missingFields": get_missing_fields_from_errors(errors),
+        "bestErrorRelevance": [error_relevance[0], list(error_relevance[1]), *error_relevance[2:]],
+        "firstError": f"{first_error.message} at \"{first_error.json_path}\"",
+    }
+
+
+def run_validation_steps(
+        validator: Validator,
+        validation_steps: List[ValidationStep],
+        instance: Any,
+        is_valid: bool,
+        cached_subtrees: Dict[str, Any],
+        subtrees: Dict[str, Any],
+        step_results: List[StepResult]
+):
+    """
+    Run the validation steps of a node, appending the step results in the order jsonschema would report them.
+    Subtrees whose digest matches their cached result are not revalidated.
+    :param validator: The compiled validator of the current schema
+    :param validation_steps: The validation steps of the node
+    :param instance: The value of the node
+    :param is_valid: The draft is already known to be valid, only the subtree digests are needed
+    :param cached_subtrees: The subtree results of the last validation of the portal run
+    :param subtrees: Collects the subtree results of this validation
+    :param step_results: Collects the step results of this validation
+    """
+    for validation_step in validation_steps:
+        if validation_step['kind'] == "property":
+            property_name = validation_step['path'][-1]
+            if isinstance(instance, dict) and property_name in instance:
+                run_validation_steps(
+                    validator, validation_step['steps'], instance[property_name],
+                    is_valid, cached_subtrees, subtrees, step_results
                 )
-            )
-        return False
-    return True
+            continue
+
+        if is_valid:
+            step_result = {"missingFields": [], "bestErrorRelevance": None, "firstError": None}
+        elif validation_step['kind'] == "shell":
+            step_result = get_step_result(validator, validation_step['schema'], instance, validation_step['path'])
+        else:
+            step_result = None
+
+        if validation_step['kind'] == "subtree":
+            subtree_key = ".".join(validation_step['path']) or "(root)"
+            subtree_digest = get_subtree_digest(instance)
+            cached_subtree = cached_subtrees.get(subtree_key)
+            if step_result is None and cached_subtree is not None and cached_subtree['digest'] == subtree_digest:
+                step_result = cached_subtree['result']
+            elif step_result is None:
+                logger.info(f"Validating changed subtree {subtree_key}")
+                step_result = get_step_result(validator, validation_step['schema'], instance, validation_step['path'])
+            subtrees[subtree_key] = {"digest": subtree_digest, "result": step_result}
 
+        step_results.append(step_result)
 
-def handler(event, context) -> Dict[str, bool]:
+
+def validate_draft_incrementally(
+        schema_validators: SchemaValidators,
+        instance: Any,
+        cache_key: str
+) -> DraftValidationResult:
+    """
+    Validate the draft against the current schema, only revalidating the subtrees of the draft
+    that changed since the last validation with the same cache key, and merging in the cached results of the rest.
+    The result is the same as validate_draft's.
+
+    :param schema_validators: The validators of the current schema.
+    :param instance: The draft data.
+    :param cache_key: The subtree validation store key, i.e. for the portal run
+    """
+    cache_entry = SUBTREE_VALIDATION_STORE.get(cache_key)
+    cached_subtrees = (
+        cache_entry['subtrees']
+        if cache_entry is not None and cache_entry['schemaSha256'] == schema_validators['schemaSha256']
+        else {}
+    )
+
+    subtrees = {}
+    step_results: List[StepResult] = []
+    run_validation_steps(
+        schema_validators['validator'],
+        schema_validators['validationSteps'],
+        instance,
+        (
+            schema_validators['getMissingFields'] is not None and
+            len(schema_validators['getMissingFields'](instance)) == 0
+        ),
+        cached_subtrees,
+        subtrees,
+        step_results
+    )
+
+    SUBTREE_VALIDATION_STORE.put(
+        cache_key,
+        {
+            "schemaSha256": schema_validators['schemaSha256'],
+            "subtrees": subtrees,
+        }
+    )
+
+    most_relevant_result = max(
+        filter(
+            lambda step_result_iter_: step_result_iter_['bestErrorRelevance'] is not None,
+            step_results
+        ),
+        key=lambda step_result_iter_: tuple(step_result_iter_['bestErrorRelevance']),
+        default=None
+    )
+
+    return {
+        "isValid": most_relevant_result is None,
+        "missingFields": [
+            missing_field
+            for step_result in step_results
+            for missing_field in step_result['missingFields']
+        ],
+        "firstError": (
+            most_relevant_result['firstError']
+            if most_relevant_result is not None
+            else None
+        ),
+    }
+
+
+def handler(event, context) -> DraftValidationResult:
     """
     Given a draft schema, validate it against the current schema and print the results.
-    :return:
+    If the event has a portalRunId, only the subtrees that changed since the last validation of the portal run
+    are revalidated.
+
+    Output:
+    {
+        "isValid": false,
+        "missingFields": ["inputs.sequenceData", "inputs.reference", ...],
+        "firstError": "'sequenceData' is a required property at \"$.inputs\""
+    }
     """
     # Get the event data
     payload_version = event.get("payloadVersion", environ[DEFAULT_PAYLOAD_VERSION_ENV_VAR])
     payload_data = event.get('data')
     workflow_run_id = event.get("workflowRunId", "")
+    portal_run_id = event.get("portalRunId")
     comment_error = event.get("addCommentOnError", False)
 
-    # Get the SSM parameters
-    schema_registry = get_ssm_parameter_value(environ[SSM_REGISTRY_NAME_ENV_VAR])
-    schema_name = json.loads(get_ssm_parameter_value(
-        str(Path(environ[SSM_SCHEMA_PATH_ENV_VAR]) / payload_version)
-    ))['schemaName']
-
-    # Get the current schema from the schema registry
-    current_schema = get_schema_from_registry(
-        registry_name=schema_registry,
-        schema_name=schema_name
-    )
-
     # Validate the draft schema against the current schema
-    is_valid_schema = validate_draft_schema(
-        current_schema,
-        # Assuming the event contains the draft schema as a JSON string
-        json.dumps(payload_data),
-        workflow_run_id=workflow_run_id,
-        comment_error=comment_error
-    )
+    if portal_run_id:
+        validation_result = validate_draft_incrementally(
+            get_schema_validator(payload_version),
+            payload_data,
+            hashlib.sha256(json.dumps([portal_run_id, payload_version]).encode()).hexdigest()
+        )
+    else:
+        validation_result = validate_draft(
+            get_schema_validator(payload_version),
+            payload_data
+        )
 
-    # Return if the schema is not valid
-    return {
-        "isValid": is_valid_schema
-    }
+    if not validation_result['isValid']:
+        logger.info(f"Failed validation, {validation_result['firstError']}")
+        if comment_error:
+            add_comment_to_workflow_run(
+                workflow_run_orcabus_id=workflow_run_id,
+                comment=f"Draft schema validation failed: {validation_result['firstError']}",
+                author=COMMENT_AUTHOR.format(
+                    WORKFLOW_NAME=environ.get(WORKFLOW_NAME_ENV_VAR)
+                )
+            )
+
+    return validation_result
@@ -7,6 +7,7 @@ import {
   DEFAULT_PAYLOAD_VERSION,
   SCHEMA_REGISTRY_NAME,
   SSM_SCHEMA_ROOT,
+  EVENT_SCHEMAS_DIR,
   REFERENCE_DATA_BUCKET_NAME,
   TEST_DATA_BUCKET_NAME,
   MIN_RAW_TUMOR_WGS_COVERAGE,
@@ -22,8 +23,54 @@ import { Construct } from 'constructs';
 import { camelCaseToKebabCase, camelCaseToSnakeCase } from '../utils';
 import * as cdk from 'aws-cdk-lib';
 import * as path from 'path';
+import * as fs from 'fs';
+import * as crypto from 'crypto';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import { SchemaNames } from '../event-schemas/interfaces';
+import { payloadVersionList } from '../interfaces';
+
+/*
+  The event schemas directory is shipped as a layer (mounted under /opt),
+  so the schema validation lambdas can use the local copy of a schema rather than the schema registry
+*/
+const EVENT_SCHEMAS_LAYER_MOUNT_PATH = '/opt';
+
+function buildEventSchemasLayer(scope: Construct): lambda.LayerVersion {
+  return new lambda.LayerVersion(scope, 'eventSchemasLayer', {
+    code: lambda.Code.fromAsset(EVENT_SCHEMAS_DIR),
+    compatibleRuntimes: [lambda.Runtime.PYTHON_3_14],
+    compatibleArchitectures: [lambda.Architecture.ARM_64],
+    description: 'Event schemas of the dragen-wgts-dna pipeline manager',
+  });
+}
+
+/*
+  Index of the bundled schemas by payload version, with the checksum of each schema file,
+  a lambda falls back to the schema registry if a version is not in the index or the checksum does not match
+*/
+function getBundledSchemasIndex(
+  schemaName: SchemaNames
+): Record<string, { path: string; sha256: string }> {
+  return Object.fromEntries(
+    payloadVersionList.map((payloadVersion) => {
+      const schemaRelPath = path.join(
+        camelCaseToKebabCase(schemaName),
+        payloadVersion,
+        'schema.json'
+      );
+      return [
+        payloadVersion,
+        {
+          path: path.join(EVENT_SCHEMAS_LAYER_MOUNT_PATH, schemaRelPath),
+          sha256: crypto
+            .createHash('sha256')
+            .update(fs.readFileSync(path.join(EVENT_SCHEMAS_DIR, schemaRelPath)))
+            .digest('hex'),
+        },
+      ];
+    })
+  );
+}
 
 function buildLambda(scope: Construct, props: LambdaInput): LambdaObject {
   const lambdaNameToSnakeCase = camelCaseToSnakeCase(props.lambdaName);
@@ -129,6 +176,17 @@ function buildLambda(scope: Construct, props: LambdaInput): LambdaObject {
     Add DEFAULT_PAYLOAD_VERSION env var too
     */
     lambdaFunction.addEnvironment('DEFAULT_PAYLOAD_VERSION', DEFAULT_PAYLOAD_VERSION);
+
+    /*
+    Add the bundled schemas layer and its index
+    */
+    if (props.eventSchemasLayer) {
+      lambdaFunction.addLayers(props.eventSchemasLayer);
+      lambdaFunction.addEnvironment(
+        'BUNDLED_SCHEMAS_INDEX',
+        JSON.stringify(getBundledSchemasIndex(draftSchemaName))
+      );
+    }
   }
 
   /*
@@ -188,12 +246,16 @@ function buildLambda(scope: Construct, props: LambdaInput): LambdaObject {
 }
 
 export function buildAllLambdas(scope: Construct): LambdaObject[] {
+  // Shared by all schema validation lambdas
+  const eventSchemasLayer = buildEventSchemasLayer(scope);
+
   // Iterate over lambdaLayerToMapping and create the lambda functions
   const lambdaObjects: LambdaObject[] = [];
   for (const lambdaName of lambdaNameList) {
     lambdaObjects.push(
       buildLambda(scope, {
         lambdaName: lambdaName,
+        eventSchemasLayer: eventSchemasLayer,
       })
     );
   }
@@ -1,4 +1,5 @@
 import { PythonUvFunction } from '@orcabus/platform-cdk-constructs/lambda';
+import * as lambda from 'aws-cdk-lib/aws-lambda';
 
 /**
  * Lambda function interface.
@@ -20,7 +21,6 @@ export type LambdaNameList =
   // Payload comparison and WRU generation
   | 'comparePayload'
   | 'generateWruEventObjectWithMergedData'
-  | 'getMissingSchemaFields'
   // Validation Functions
   | 'validateDraftCompleteSchema'
   | 'postSchemaValidation'
@@ -52,7 +52,6 @@ export const lambdaNameList: LambdaNameList[] = [
   // Payload comparison and WRU generation
   'comparePayload',
   'generateWruEventObjectWithMergedData',
-  'getMissingSchemaFields',
   // Validation Functions
   'validateDraftCompleteSchema',
   'postSchemaValidation',
@@ -119,7 +118,6 @@ export const lambdaRequirementsMap: Record<LambdaNameList, LambdaRequirements> =
   // Payload comparison and WRU generation
   comparePayload: {},
   generateWruEventObjectWithMergedData: { needsOrcabusApiTools: true },
-  getMissingSchemaFields: { needsSchemaRegistryAccess: true, needsSsmParametersAccess: true },
   // Validation Functions
   validateDraftCompleteSchema: {
     needsSchemaRegistryAccess: true,
@@ -154,6 +152,7 @@ export const lambdaRequirementsMap: Record<LambdaNameList, LambdaRequirements> =
 
 export interface LambdaInput {
   lambdaName: LambdaNameList;
+  eventSchemasLayer?: lambda.ILayerVersion;
 }
 
 export interface LambdaObject extends LambdaInput {
@@ -90,7 +90,6 @@ export const stepFunctionToLambdasMap: Record<StateMachineNameList, LambdaNameLi
     'addPopulateDraftComment',
     'comparePayload',
     'generateWruEventObjectWithMergedData',
-    'getMissingSchemaFields',
   ],
   validateDraftDataAndPutReadyEvent: ['validateDraftCompleteSchema', 'postSchemaValidation'],
   readyEventToIcav2WesRequestEvent: ['addReadyComment', 'dragenWgtsDnaReadyToIcav2WesRequest'],
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""
+Recompute the post analysis tags for historical dragen-wgts-dna runs
+
+Reuses the add_post_analysis_tags lambda to collect the tags for a list of portal run ids
+(or for a list of variant calling output uris), fanning out across a process pool.
+
+Progress is checkpointed to a local state file after every job, so an interrupted backfill
+can be re-run with the same arguments and will only process the jobs that have not yet succeeded.
+Results are appended to the output file as JSON lines.
+
+Requires the orcabus_api_tools package to be installed locally, and the following env vars (or their defaults)
+AWS_PROFILE
+HOSTNAME_SSM_PARAMETER_NAME (/hosted_zone/umccr/name)
+ORCABUS_TOKEN_SECRET_ID (orcabus/token-service-jwt)
+
+Usage:
+  backfill_post_analysis_tags.py --portal-run-ids portal_run_ids.txt --output-jsonl tags.jsonl
+  backfill_post_analysis_tags.py --output-uris samples.jsonl --output-jsonl tags.jsonl
+
+Where portal_run_ids.txt has one portal run id per line, and samples.jsonl has one
+{"sampleName": "L2300902", "outputUri": "s3://.../", "isTumor": true} object per line
+
+Each line of the output file looks like
+{"id": "20250911abcd1234", "samples": [...], "tags": {...}}
+"""
+
+# Standard imports
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from os import environ
+from pathlib import Path
+from typing import Any, Dict, List, Set, TypedDict
+
+# Globals
+LAMBDA_DIR = Path(__file__).absolute().parent.parent / "app" / "lambdas" / "add_post_analysis_tags_py"
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_HOSTNAME_SSM_PARAMETER_NAME = "/hosted_zone/umccr/name"
+DEFAULT_ORCABUS_TOKEN_SECRET_ID = "orcabus/token-service-jwt"
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillJob(TypedDict):
+    """
+    A single unit of work, either a portal run id (samples are resolved by the worker)
+    or a single sample
+    """
+    id: str
+    portalRunId: str | None
+    samples: List[Dict[str, Any]]
+
+
+def get_samples_from_portal_run_id(portal_run_id: str) -> List[Dict[str, Any]]:
+    """
+    Resolve the germline (and tumor if present) variant calling outputs of a workflow run,
+    the same way the icav2-wes-event-to-wrsc state machine does for a SUCCEEDED run
+    """
+    # Layer imports, only available once the environment has been set up in the worker
+    from orcabus_api_tools.workflow import (
+        get_latest_payload_from_workflow_run,
+        get_workflow_run_from_portal_run_id
+    )
+
+    workflow_run = get_workflow_run_from_portal_run_id(portal_run_id)
+    payload_data = get_latest_payload_from_workflow_run(workflow_run['orcabusId'])['data']
+
+    output_uri = payload_data['engineParameters']['outputUri']
+    outputs = payload_data.get('outputs', {})
+
+    if not outputs.get('dragenGermlineVariantCallingOutputRelPath'):
+        raise ValueError(f"Workflow run {portal_run_id} has no germline variant calling outputs")
+
+    samples = [
+        {
+            "sampleName": payload_data['inputs']['sampleName'],
+            "outputUri": output_uri + outputs['dragenGermlineVariantCallingOutputRelPath'],
+            "isTumor": False,
+        }
+    ]
+
+    if payload_data.get('tags', {}).get('tumorLibraryId'):
+        samples.append({
+            "sampleName": payload_data['inputs']['tumorSampleName'],
+            "outputUri": output_uri + outputs['dragenSomaticVariantCallingOutputRelPath'],
+            "isTumor": True,
+        })
+
+    return samples
+
+
+def init_worker():
+    """
+    Set up the environment for the add_post_analysis_tags lambda in each worker process
+    """
+    environ.setdefault('HOSTNAME_SSM_PARAMETER_NAME', DEFAULT_HOSTNAME_SSM_PARAMETER_NAME)
+    environ.setdefault('ORCABUS_TOKEN_SECRET_ID', DEFAULT_ORCABUS_TOKEN_SECRET_ID)
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+
+def run_job(job: BackfillJob) -> Dict[str, Any]:
+    """
+    Collect the post analysis tags for a job, using the same extractors as the lambda
+    """
+    from add_post_analysis_tags import handler
+
+    samples = (
+        get_samples_from_portal_run_id(job['portalRunId'])
+        if job['portalRunId'] is not None
+        else job['samples']
+    )
+
+    return {
+        "id": job['id'],
+        "samples": samples,
+        "tags": handler({"samples": samples}, None)['tags'],
+    }
+
+
+def read_jobs(portal_run_ids_path: Path | None, output_uris_path: Path | None) -> List[BackfillJob]:
+    """
+    Read the jobs from the input file, duplicates are dropped
+    """
+    jobs: Dict[str, BackfillJob] = {}
+
+    if portal_run_ids_path is not None:
+        for line in portal_run_ids_path.read_text().splitlines():
+            portal_run_id = line.strip()
+            if not portal_run_id or portal_run_id.startswith("#"):
+                continue
+            jobs[portal_run_id] = {
+                "id": portal_run_id,
+                "portalRunId": portal_run_id,
+                "samples": [],
+            }
+    else:
+        for line in output_uris_path.read_text().splitlines():
+            if not line.strip():
+                continue
+            sample = json.loads(line)
+            if not sample.get("sampleName") or not sample.get("outputUri"):
+                raise ValueError(f"sampleName and outputUri are required, got '{line}'")
+            sample["isTumor"] = sample.get("isTumor", False)
+            jobs[sample["outputUri"]] = {
+                "id": sample["outputUri"],
+                "portalRunId": None,
+                "samples": [sample],
+            }
+
+    return list(jobs.values())
+
+
+def read_completed_job_ids(state_path: Path) -> Set[str]:
+    """
+    The state file is a JSON lines file of {"id": ..., "status": "SUCCEEDED" | "FAILED", ...} records,
+    the last record for a job wins
+    """
+    if not state_path.exists():
+        return set()
+
+    status_by_job_id = {}
+    for line in state_path.read_text().splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A partially written line from an interrupted run
+            continue
+        status_by_job_id[record['id']] = record['status']
+
+    return set(
+        job_id
+        for job_id, status in status_by_job_id.items()
+        if status == "SUCCEEDED"
+    )
+
+
+def append_json_line(path: Path, record: Dict[str, Any]):
+    with open(path, "a") as file_h:
+        file_h.write(json.dumps(record) + "\n")
+        file_h.flush()
+
+
+def run_backfill(
+        jobs: List[BackfillJob],
+        output_path: Path,
+        state_path: Path,
+        max_workers: int
+) -> int:
+    """
+    Run the jobs across a process pool, at most max_workers jobs are in flight at any one time.
+
+    The result is written to the output file before the job is marked as complete in the state file,
+    so a crash can only ever cause a job to be re-run (and its line repeated), never lost.
+    :return: The number of failed jobs
+    """
+    completed_job_ids = read_completed_job_ids(state_path)
+    pending_jobs = list(filter(
+        lambda job_iter_: job_iter_['id'] not in completed_job_ids,
+        jobs
+    ))
+    logger.info(
+        f"{len(jobs)} jobs, {len(jobs) - len(pending_jobs)} already complete, {len(pending_jobs)} to run"
+    )
+
+    num_failed = 0
+    num_done = 0
+    jobs_iter = iter(pending_jobs)
+    in_flight: Dict[Future, BackfillJob] = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+        while True:
+            # Top up the in-flight window
+            while len(in_flight) < max_workers:
+                job = next(jobs_iter, None)
+                if job is None:
+                    break
+                in_flight[executor.submit(run_job, job)] = job
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                num_done += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    num_failed += 1
+                    logger.error(f"Job {job['id']} failed: {e}")
+                    append_json_line(state_path, {"id": job['id'], "status": "FAILED", "error": str(e)})
+                    continue
+
+                append_json_line(output_path, result)
+                append_json_line(state_path, {"id": job['id'], "status": "SUCCEEDED"})
+                logger.info(f"[{num_done}/{len(pending_jobs)}] Job {job['id']} complete")
+
+    return num_failed
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute the post analysis tags for historical dragen-wgts-dna runs"
+    )
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
+        "--portal-run-ids", type=Path,
+        help="File with one portal run id per line"
+    )
+    input_group.add_argument(
+        "--output-uris", type=Path,
+        help="JSON lines file of {\"sampleName\", \"outputUri\", \"isTumor\"} objects"
+    )
+    parser.add_argument(
+        "--output-jsonl", type=Path, required=True,
+        help="JSON lines file the results are appended to"
+    )
+    parser.add_argument(
+        "--state-file", type=Path,
+        help="Checkpoint file used to resume an interrupted backfill (default: <output-jsonl>.state)"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum number of jobs to run concurrently (default: {DEFAULT_MAX_WORKERS})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = get_args()
+
+    if args.max_workers < 1:
+        raise ValueError("--max-workers must be at least 1")
+
+    state_path = (
+        args.state_file
+        if args.state_file is not None
+        else args.output_jsonl.with_name(args.output_jsonl.name + ".state")
+    )
+
+    num_failed = run_backfill(
+        jobs=read_jobs(args.portal_run_ids, args.output_uris),
+        output_path=args.output_jsonl,
+        state_path=state_path,
+        max_workers=args.max_workers,
+    )
+
+    if num_failed > 0:
+        logger.error(f"{num_failed} jobs failed, re-run the same command to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the generated complete-data-draft validators against jsonschema's interpreted validator
+
+For each lane count, builds a tumor / normal draft with that many fastq list rows per sample,
+and times get_missing_fields of the generated module against iter_errors + get_missing_fields_from_errors
+of the interpreted validator (what validate_draft_complete_schema ran for every draft before).
+
+Before timing, confirms the generated validator returns exactly the same missing fields as the interpreted
+validator for the valid draft and a set of invalid drafts, and exits 1 if they differ.
+
+Requires jsonschema, boto3 and the orcabus_api_tools package to be installed locally
+(the interpreted side reuses the lambda's own missing fields logic).
+
+Usage:
+  benchmark_schema_validators.py [--payload-version 2025.06.04] [--lanes 8 32 128] [--repeat 200]
+"""
+
+# Standard imports
+import argparse
+import json
+import sys
+from pathlib import Path
+from timeit import timeit
+from typing import Any, Callable, Dict, List
+
+# Jsonschema imports
+from jsonschema import Draft202012Validator
+
+# Globals
+REPO_ROOT = Path(__file__).absolute().parent.parent
+SCHEMAS_DIR = REPO_ROOT / "app" / "event-schemas" / "complete-data-draft"
+LAMBDA_DIR = REPO_ROOT / "app" / "lambdas" / "validate_draft_complete_schema_py"
+DEFAULT_PAYLOAD_VERSION = "2025.06.04"
+DEFAULT_LANE_COUNTS = [8, 32, 128]
+DEFAULT_REPEAT = 200
+
+
+def get_fastq_list_rows(library_id: str, num_lanes: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "rgid": f"GAATTCGT+TTATGAGT.{lane}.250101_A01052_0001_BHXXXXXXXX",
+            "rglb": library_id,
+            "rgsm": library_id,
+            "lane": lane,
+            "read1FileUri": f"s3://pipeline-data/primary/250101_A01052_0001_BHXXXXXXXX/{library_id}_L00{lane}_R1_001.fastq.ora",
+            "read2FileUri": f"s3://pipeline-data/primary/250101_A01052_0001_BHXXXXXXXX/{library_id}_L00{lane}_R2_001.fastq.ora",
+        }
+        for lane in range(1, num_lanes + 1)
+    ]
+
+
+def get_draft(num_lanes: int) -> Dict[str, Any]:
+    """
+    A valid tumor / normal draft with num_lanes fastq list rows per sample
+    """
+    return {
+        "inputs": {
+            "sampleName": "L2300902",
+            "tumorSampleName": "L2300903",
+            "sequenceData": {"fastqListRows": get_fastq_list_rows("L2300902", num_lanes)},
+            "tumorSequenceData": {"fastqListRows": get_fastq_list_rows("L2300903", num_lanes)},
+            "reference": {
+                "name": "hg38",
+                "structure": "graph",
+                "tarball": "s3://reference-data/refdata/dragen-hash-tables/hg38-alt_masked.tar.gz",
+            },
+            "oraReference": "s3://reference-data/refdata/dragen-ora/ora_reference_v2.tar.gz",
+        },
+        "tags": {
+            "libraryId": "L2300902",
+            "tumorLibraryId": "L2300903",
+            "fastqRgidList": [f"GAATTCGT+TTATGAGT.{lane}.250101_A01052_0001_BHXXXXXXXX" for lane in range(1, num_lanes + 1)],
+            "subjectId": "SBJ00001",
+        },
+        "engineParameters": {
+            "projectId": "ea19a3f5-ec7c-4940-a474-c31cd91dbad4",
+            "pipelineId": "5009335a-8425-48a8-83c4-17c54607b44a",
+            "outputUri": "s3://project-data/analysis/dragen-wgts-dna/20250101abcd1234/",
+            "logsUri": "s3://project-data/logs/dragen-wgts-dna/20250101abcd1234/",
+        },
+    }
+
+
+def get_invalid_drafts() -> List[Any]:
+    """
+    Drafts covering each kind of error the schema can report (and the integral float edge case, which is valid)
+    """
+    drafts = []
+
+    for mutate in [
+        lambda draft_iter_: draft_iter_.pop("tags"),
+        lambda draft_iter_: draft_iter_["inputs"]["reference"].pop("tarball"),
+        lambda draft_iter_: draft_iter_["inputs"]["sequenceData"]["fastqListRows"][2].update({"lane": "3"}),
+        lambda draft_iter_: draft_iter_["inputs"]["sequenceData"]["fastqListRows"][2].update({"lane": 3.5}),
+        # Valid, an integral float is an integer
+        lambda draft_iter_: draft_iter_["inputs"]["sequenceData"]["fastqListRows"][2].update({"lane": 3.0}),
+        lambda draft_iter_: draft_iter_["inputs"]["sequenceData"]["fastqListRows"][0].pop("rgid"),
+        lambda draft_iter_: draft_iter_["inputs"]["reference"].update({"structure": "ring"}),
+        lambda draft_iter_: draft_iter_["inputs"].update({"oraReference": "https://example.com/ora.tar.gz"}),
+        lambda draft_iter_: draft_iter_["tags"].update({"fastqRgidList": "GAATTCGT"}),
+        lambda draft_iter_: draft_iter_["engineParameters"].update({"outputUri": "s3://project-data/nope/"}),
+        lambda draft_iter_: draft_iter_["engineParameters"].update({"outputUri": "s3://project-data/output/analysis/x/"}),
+        lambda draft_iter_: draft_iter_["engineParameters"].update({"logsUri": "s3://project-data/analysis/x/"}),
+        lambda draft_iter_: draft_iter_["engineParameters"].clear(),
+    ]:
+        draft = get_draft(num_lanes=4)
+        mutate(draft)
+        drafts.append(draft)
+
+    return drafts + [{}, [], None, {"inputs": 1, "tags": [], "engineParameters": None}]
+
+
+def get_validators(payload_version: str) -> Dict[str, Callable[[Any], List[str]]]:
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from generated_validators import GENERATED_VALIDATORS_BY_PAYLOAD_VERSION
+    from validate_draft_complete_schema import get_missing_fields_from_errors, get_schema_checksum
+
+    schema = json.loads((SCHEMAS_DIR / payload_version / "schema.json").read_bytes())
+    schema_sha256, generated_get_missing_fields = GENERATED_VALIDATORS_BY_PAYLOAD_VERSION[payload_version]
+    if schema_sha256 != get_schema_checksum(schema):
+        raise ValueError(
+            f"Generated validator for {payload_version} is out of date, run scripts/generate_schema_validators.py"
+        )
+
+    validator = Draft202012Validator(schema)
+
+    return {
+        "interpreted": lambda instance_iter_: get_missing_fields_from_errors(list(validator.iter_errors(instance_iter_))),
+        "generated": generated_get_missing_fields,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the generated complete-data-draft validators against jsonschema"
+    )
+    parser.add_argument("--payload-version", default=DEFAULT_PAYLOAD_VERSION)
+    parser.add_argument("--lanes", type=int, nargs="+", default=DEFAULT_LANE_COUNTS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args()
+
+    validators = get_validators(args.payload_version)
+
+    # Confirm both validators agree before timing anything
+    mismatches = list(filter(
+        lambda draft_iter_: validators["generated"](draft_iter_) != validators["interpreted"](draft_iter_),
+        [get_draft(num_lanes=4)] + get_invalid_drafts()
+    ))
+    if mismatches:
+        for draft in mismatches:
+            print(
+                f"Mismatch: generated {validators['generated'](draft)} != interpreted {validators['interpreted'](draft)}",
+                file=sys.stderr
+            )
+        sys.exit(1)
+
+    print(f"{'lanes':>6} {'interpreted (ms)':>17} {'generated (ms)':>15} {'speedup':>8}")
+    for num_lanes in args.lanes:
+        draft = get_draft(num_lanes)
+        timings = {
+            name: timeit(lambda: validate_func(draft), number=args.repeat) / args.repeat * 1000
+            for name, validate_func in validators.items()
+        }
+        print(
+            f"{num_lanes:>6} {timings['interpreted']:>17.3f} {timings['generated']:>15.3f} "
+            f"{timings['interpreted'] / timings['generated']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+"""
+Compile the complete-data-draft schemas into plain python validation functions
+
+Each versioned schema under app/event-schemas/complete-data-draft is turned into a module under
+app/lambdas/validate_draft_complete_schema_py/generated_validators/ exposing get_missing_fields(instance).
+
+The generated functions walk the instance exactly as jsonschema's Draft202012Validator does
+(same keyword order, same error messages), and return the same missing / invalid field paths
+as validate_draft_complete_schema.get_missing_fields_from_errors, without the overhead of the interpreted validator.
+
+Only the keywords used by our schemas are supported, generation fails on any other validation keyword.
+
+Re-run this script whenever a schema is added or changed, the lambda only uses a generated module
+whose schema checksum matches the schema it has loaded (and uses the interpreted validator otherwise).
+
+Usage:
+  generate_schema_validators.py          # (Re)generate the modules
+  generate_schema_validators.py --check  # Exit 1 if the generated modules are out of date
+"""
+
+# Standard imports
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Jsonschema imports
+from jsonschema import Draft202012Validator
+
+# Globals
+REPO_ROOT = Path(__file__).absolute().parent.parent
+SCHEMAS_DIR = REPO_ROOT / "app" / "event-schemas" / "complete-data-draft"
+GENERATED_VALIDATORS_DIR = (
+    REPO_ROOT / "app" / "lambdas" / "validate_draft_complete_schema_py" / "generated_validators"
+)
+
+# Keywords the generator can compile, every other validation keyword is rejected
+SUPPORTED_KEYWORDS = {
+    "$ref", "type", "enum", "pattern", "properties", "required", "items", "allOf", "oneOf"
+}
+
+GENERATED_HEADER = '''#!/usr/bin/env python3
+
+"""
+GENERATED by scripts/generate_schema_validators.py from
+app/event-schemas/complete-data-draft/{PAYLOAD_VERSION}/schema.json, do not edit
+"""
+
+# Standard imports
+import re
+from typing import Any, Callable, List, Tuple
+
+SCHEMA_SHA256 = "{SCHEMA_SHA256}"
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{{path}}.{{key}}" if path else str(key)
+
+
+def _add_error(path: str, message: str, missing_fields: List[str]):
+    missing_fields.append(f"{{path or '(root)'}} ({{message[:50]}})")
+
+
+def _is_valid(validate_func: Callable, instance: Any) -> bool:
+    errors = []
+    validate_func(instance, "", errors)
+    return len(errors) == 0
+
+
+def _one_of(
+        instance: Any,
+        path: str,
+        missing_fields: List[str],
+        validate_funcs: Tuple[Callable, ...],
+        schema_reprs: Tuple[str, ...]
+):
+    valid_idxs = [
+        idx
+        for idx, validate_func in enumerate(validate_funcs)
+        if _is_valid(validate_func, instance)
+    ]
+    if len(valid_idxs) == 0:
+        _add_error(path, f"{{instance!r}} is not valid under any of the given schemas", missing_fields)
+    elif len(valid_idxs) > 1:
+        # Same order as jsonschema, the other valid schemas then the first valid schema
+        reprs = ", ".join(schema_reprs[idx] for idx in valid_idxs[1:] + valid_idxs[:1])
+        _add_error(path, f"{{instance!r}} is valid under each of {{reprs}}", missing_fields)
+'''
+
+TYPE_CHECKS = {
+    "string": "isinstance(instance, str)",
+    "object": "isinstance(instance, dict)",
+    "array": "isinstance(instance, list)",
+    # Like jsonschema, integral floats (i.e. 1.0) are integers too
+    "integer": (
+        "((isinstance(instance, int) and not isinstance(instance, bool)) or "
+        "(isinstance(instance, float) and instance.is_integer()))"
+    ),
+    "number": "(isinstance(instance, (int, float)) and not isinstance(instance, bool))",
+    "boolean": "isinstance(instance, bool)",
+    "null": "instance is None",
+}
+
+
+class ValidatorCodeGenerator:
+    """
+    Generates one function per schema node, def(instance, path, missing_fields),
+    that appends the missing / invalid field paths of the instance to missing_fields
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.function_blocks: List[str] = []
+        self.constant_lines: List[str] = []
+        self.function_name_by_ref: Dict[str, str] = {}
+        self.function_name_by_subschema: Dict[str, str] = {}
+        self.counter = 0
+
+    def get_unique_name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}_{self.counter}"
+
+    def resolve_ref(self, ref: str) -> Any:
+        if not ref.startswith("#/"):
+            raise NotImplementedError(f"Only local refs are supported, got '{ref}'")
+        node = self.schema
+        for part in ref[2:].split("/"):
+            node = node[part]
+        return node
+
+    def get_ref_function_name(self, ref: str) -> str:
+        if ref not in self.function_name_by_ref:
+            # Register before generating so recursive refs resolve to the same function
+            function_name = self.get_unique_name(
+                "_validate_" + re.sub(r"\W", "_", ref.rsplit("/", 1)[-1])
+            )
+            self.function_name_by_ref[ref] = function_name
+            self.add_function(function_name, self.resolve_ref(ref))
+        return self.function_name_by_ref[ref]
+
+    def get_function_name(self, subschema: Any) -> str:
+        # A subschema that is only a ref is validated by the ref's function directly
+        if isinstance(subschema, dict) and list(subschema.keys()) == ["$ref"]:
+            return self.get_ref_function_name(subschema["$ref"])
+        # Identical inline subschemas (keyword order included) share a function
+        subschema_key = json.dumps(subschema)
+        if subschema_key not in self.function_name_by_subschema:
+            function_name = self.get_unique_name("_validate_node")
+            self.function_name_by_subschema[subschema_key] = function_name
+            self.add_function(function_name, subschema)
+        return self.function_name_by_subschema[subschema_key]
+
+    def add_function(self, function_name: str, subschema: Any):
+        if not isinstance(subschema, dict):
+            raise NotImplementedError(f"Boolean schemas are not supported, got {subschema!r}")
+
+        body_lines = []
+        for keyword, value in subschema.items():
+            if keyword not in Draft202012Validator.VALIDATORS:
+                # Annotations / unknown keywords are ignored by jsonschema too
+                continue
+            if keyword not in SUPPORTED_KEYWORDS:
+                raise NotImplementedError(f"Keyword '{keyword}' is not supported by the generator")
+            body_lines.extend(getattr(self, f"get_{keyword.lstrip('$')}_lines")(value))
+
+        self.function_blocks.append("\n".join(
+            [f"def {function_name}(instance: Any, path: str, missing_fields: List[str]):"] +
+            (
+                list(map(lambda line_iter_: f"    {line_iter_}", body_lines))
+                if body_lines
+                else ["    pass"]
+            )
+        ))
+
+    def get_ref_lines(self, ref: str) -> List[str]:
+        return [f"{self.get_ref_function_name(ref)}(instance, path, missing_fields)"]
+
+    def get_type_lines(self, types: Any) -> List[str]:
+        types = types if isinstance(types, list) else [types]
+        message_suffix = ", ".join(map(repr, types))
+        return [
+            f"if not ({' or '.join(TYPE_CHECKS[type_] for type_ in types)}):",
+            f"    _add_error(path, f\"{{instance!r}} is not of type {message_suffix}\", missing_fields)",
+        ]
+
+    def get_enum_lines(self, enums: List[Any]) -> List[str]:
+        if not all(isinstance(enum_, str) for enum_ in enums):
+            raise NotImplementedError(f"Only string enums are supported, got {enums!r}")
+        constant_name = self.get_unique_name("_ENUM")
+        self.constant_lines.append(f"{constant_name} = {enums!r}")
+        return [
+            f"if instance not in {constant_name}:",
+            f"    _add_error(path, f\"{{instance!r}} is not one of {{{constant_name}!r}}\", missing_fields)",
+        ]
+
+    def get_pattern_lines(self, pattern: str) -> List[str]:
+        constant_name = self.get_unique_name("_PATTERN")
+        self.constant_lines.append(f"{constant_name} = re.compile({pattern!r})")
+        return [
+            f"if isinstance(instance, str) and not {constant_name}.search(instance):",
+            f"    _add_error(path, f\"{{instance!r}} does not match {{{constant_name}.pattern!r}}\", missing_fields)",
+        ]
+
+    def get_properties_lines(self, properties: Dict[str, Any]) -> List[str]:
+        lines = ["if isinstance(instance, dict):"]
+        for property_name, property_schema in properties.items():
+            lines.extend([
+                f"    if {property_name!r} in instance:",
+                f"        {self.get_function_name(property_schema)}("
+                f"instance[{property_name!r}], _join(path, {property_name!r}), missing_fields)",
+            ])
+        return lines
+
+    def get_required_lines(self, required: List[str]) -> List[str]:
+        # Each missing property is its own error, and each required error lists every missing property
+        return [
+            "if isinstance(instance, dict):",
+            f"    _missing_properties = [_prop for _prop in {required!r} if _prop not in instance]",
+            "    for _ in _missing_properties:",
+            "        missing_fields.extend(_join(path, _prop) for _prop in _missing_properties)",
+        ]
+
+    def get_items_lines(self, items: Any) -> List[str]:
+        return [
+            "if isinstance(instance, list):",
+            "    for _idx, _item in enumerate(instance):",
+            f"        {self.get_function_name(items)}(_item, _join(path, _idx), missing_fields)",
+        ]
+
+    def get_allOf_lines(self, subschemas: List[Any]) -> List[str]:
+        return list(map(
+            lambda subschema_iter_: f"{self.get_function_name(subschema_iter_)}(instance, path, missing_fields)",
+            subschemas
+        ))
+
+    def get_oneOf_lines(self, subschemas: List[Any]) -> List[str]:
+        function_names = list(map(self.get_function_name, subschemas))
+        constant_name = self.get_unique_name("_ONE_OF_REPRS")
+        self.constant_lines.append(
+            f"{constant_name} = {tuple(map(repr, subschemas))!r}"
+        )
+        return [
+            f"_one_of(instance, path, missing_fields, ({', '.join(function_names)},), {constant_name})",
+        ]
+
+    def generate(self, payload_version: str, schema_sha256: str) -> str:
+        root_function_name = self.get_function_name(self.schema)
+        return "\n".join([
+            GENERATED_HEADER.format(PAYLOAD_VERSION=payload_version, SCHEMA_SHA256=schema_sha256),
+            "",
+            *self.constant_lines,
+            "",
+            *map(lambda block_iter_: f"\n{block_iter_}\n", self.function_blocks),
+            "",
+            "def get_missing_fields(instance: Any) -> List[str]:",
+            '    """',
+            "    Get the missing / invalid field paths of the instance, an empty list if the instance is valid",
+            '    """',
+            "    missing_fields = []",
+            f"    {root_function_name}(instance, \"\", missing_fields)",
+            "    return missing_fields",
+            "",
+        ])
+
+
+def get_schema_checksum(schema: Dict[str, Any]) -> str:
+    """
+    Checksum of the schema independent of its formatting, but not of its key order
+    (the key order sets the order the generated functions report errors in).
+    Must match validate_draft_complete_schema.get_schema_checksum
+    """
+    return hashlib.sha256(json.dumps(schema).encode()).hexdigest()
+
+
+def get_module_name(payload_version: str) -> str:
+    return "complete_data_draft_" + payload_version.replace(".", "_")
+
+
+def generate_modules() -> Dict[Path, str]:
+    """
+    :return: path -> contents of each generated file
+    """
+    generated_files = {}
+    payload_versions = sorted(
+        schema_path.parent.name
+        for schema_path in SCHEMAS_DIR.glob("*/schema.json")
+    )
+
+    for payload_version in payload_versions:
+        schema = json.loads((SCHEMAS_DIR / payload_version / "schema.json").read_bytes())
+        generated_files[GENERATED_VALIDATORS_DIR / f"{get_module_name(payload_version)}.py"] = (
+            ValidatorCodeGenerator(schema).generate(payload_version, get_schema_checksum(schema))
+        )
+
+    generated_files[GENERATED_VALIDATORS_DIR / "__init__.py"] = "\n".join([
+        '#!/usr/bin/env python3',
+        '',
+        '"""',
+        'GENERATED by scripts/generate_schema_validators.py, do not edit',
+        '',
+        'Generated validators by payload version, as (schema sha256, get_missing_fields)',
+        '"""',
+        '',
+        'from typing import Any, Callable, Dict, List, Tuple',
+        '',
+        *map(
+            lambda payload_version_iter_: (
+                f"from . import {get_module_name(payload_version_iter_)}"
+            ),
+            payload_versions
+        ),
+        '',
+        'GENERATED_VALIDATORS_BY_PAYLOAD_VERSION: Dict[str, Tuple[str, Callable[[Any], List[str]]]] = {',
+        *map(
+            lambda payload_version_iter_: (
+                f'    "{payload_version_iter_}": ('
+                f'{get_module_name(payload_version_iter_)}.SCHEMA_SHA256, '
+                f'{get_module_name(payload_version_iter_)}.get_missing_fields),'
+            ),
+            payload_versions
+        ),
+        '}',
+        '',
+    ])
+
+    return generated_files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile the complete-data-draft schemas into python validation functions"
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Do not write anything, exit 1 if the generated modules are out of date"
+    )
+    args = parser.parse_args()
+
+    generated_files = generate_modules()
+
+    if args.check:
+        out_of_date = list(filter(
+            lambda path_iter_: (
+                not path_iter_.exists() or
+                path_iter_.read_text() != generated_files[path_iter_]
+            ),
+            generated_files
+        ))
+        for path in out_of_date:
+            print(f"{path.relative_to(REPO_ROOT)} is out of date", file=sys.stderr)
+        sys.exit(1 if out_of_date else 0)
+
+    GENERATED_VALIDATORS_DIR.mkdir(parents=True, exist_ok=True)
+    for path, contents in generated_files.items():
+        path.write_text(contents)
+        print(f"Wrote {path.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()